@@ -0,0 +1 @@
+"""Importable version of the lab analyses."""
@@ -0,0 +1,217 @@
+"""Numeric tables behind the lab analyses, without any plotting.
+
+Only NumPy and pandas are imported with the module. statsmodels is imported
+by the tests that need it, the first time they run.
+"""
+import numpy as np
+import pandas as pd
+
+from .data import (
+    DOLLARIZED,
+    MINWAGE_IN_ARG,
+    clean_outliers,
+    explode_languages,
+    new_regions,
+    profile_age,
+    profile_gender,
+    profile_years_experience,
+    programming_language,
+    region,
+    salary_in_usd,
+    salary_monthly_NETO,
+    work_contract_type,
+    work_province,
+)
+
+
+def min_central_tendency(df, col, max_threshold):
+    tendency = [
+        (
+            threshold,
+            df[df[col] > threshold][col].mean(),
+            df[df[col] > threshold][col].median()
+        )
+        for threshold in range(df[col].min(), max_threshold)
+    ]
+
+    tendency_df = pd.DataFrame(tendency, columns=['threshold', 'mean', 'median'])
+    tendency_df["distance"] = abs(tendency_df["mean"] - tendency_df["median"])
+    best_threshold = tendency_df.idxmin()["distance"]
+
+    return (
+        tendency_df.melt(id_vars='threshold', var_name='metric'),
+        best_threshold
+    )
+
+
+def language_population(db, minwage=MINWAGE_IN_ARG, max_experience=5):
+    """Returns the exploded full-time, non dollarized, junior population."""
+    return junior_population(explode_languages(db), minwage, max_experience)
+
+
+def junior_population(df, minwage=MINWAGE_IN_ARG, max_experience=5):
+    """Returns the full-time, non dollarized, junior rows of the survey
+    already exploded by programming language.
+    """
+    rvs = [
+        programming_language,
+        work_contract_type,
+        profile_years_experience,
+        salary_in_usd,
+        salary_monthly_NETO,
+    ]
+    return df[
+        (df[work_contract_type] == "Full-Time") &
+        (df[salary_monthly_NETO] > minwage) &
+        (df[profile_years_experience] <= max_experience) &
+        (df[salary_in_usd] != DOLLARIZED)
+    ][rvs]
+
+
+def language_counts(df):
+    return df.groupby(programming_language).agg(
+        salary_monthly_NETO_mean=(salary_monthly_NETO, "mean"),
+        count=(programming_language, "count")
+    )
+
+
+def clean_outliers_by_group(df, group_col, col, n_std=2.5):
+    """Returns @df removing rows above @n_std deviations of their group mean."""
+    limits = df[[group_col, col]] \
+        .groupby(group_col) \
+        .agg(mean=(col, "mean"), std=(col, "std"))
+    limits["limit"] = limits["mean"] + n_std * limits["std"]
+    df = df.merge(limits, on=group_col)
+    return df[df[col] <= df["limit"]]
+
+
+def best_languages(df, max_threshold=100, n_std=2.5):
+    """Returns the language counts, the popularity threshold and the popular
+    languages population without outliers.
+    """
+    count_bylangs = language_counts(df)
+    tendency_df, best_threshold = min_central_tendency(
+        count_bylangs,
+        "count",
+        max_threshold
+    )
+    best_langs = count_bylangs[count_bylangs["count"] >= best_threshold]
+    df_langs = df[
+        df[programming_language].isin(best_langs.index.to_list())
+    ].reset_index(drop=True)
+    df_langs = clean_outliers_by_group(
+        df_langs, programming_language, salary_monthly_NETO, n_std
+    )
+    return count_bylangs, tendency_df, best_threshold, best_langs, df_langs
+
+
+def region_population(db, minwage=MINWAGE_IN_ARG):
+    """Returns the curated population of exercise2 with its work region."""
+    rvs = [
+        work_province,
+        work_contract_type,
+        salary_monthly_NETO,
+        profile_years_experience,
+        profile_age,
+        salary_in_usd
+    ]
+    df = db[
+        (db[profile_years_experience] < 50) &
+        (db[profile_age] < 100) &
+        (db[salary_monthly_NETO] > minwage)
+    ][rvs] \
+        .replace({
+            DOLLARIZED: "dolarizado",
+            'Tercerizado (trabajo a través de consultora o agencia)': 'Tercerizado'
+        }) \
+        .fillna("No dolarizado")
+    df = clean_outliers(df, salary_monthly_NETO)
+    df[region] = df[work_province].replace(new_regions)
+    return df
+
+
+def gender_groups(db, min_salary=1000):
+    """Returns the net salaries of men (A) and of women and others (B)."""
+    is_man = db[profile_gender] == 'Hombre'
+    is_valid = db[salary_monthly_NETO] > min_salary
+    return (
+        db[is_valid & is_man][salary_monthly_NETO],
+        db[is_valid & ~is_man][salary_monthly_NETO],
+    )
+
+
+def hypothesis_tests(groupA, groupB, alpha=0.05, weightsA=None, weightsB=None):
+    """Returns the point estimate, confidence intervals and upper tail z and t
+    tests for the difference of the means of @groupA and @groupB.
+
+    @weightsA and @weightsB are optional survey weights of each group, e.g.
+    from `raking.rake_frame`. They are rescaled to sum to the size of their
+    group, so they move the means without changing the number of
+    observations behind each one.
+    """
+    import statsmodels.stats.api as sms
+
+    if weightsA is not None:
+        weightsA = np.asarray(weightsA, dtype=float)
+        weightsA = weightsA * groupA.size / weightsA.sum()
+    if weightsB is not None:
+        weightsB = np.asarray(weightsB, dtype=float)
+        weightsB = weightsB * groupB.size / weightsB.sum()
+    statsA = sms.DescrStatsW(groupA, weights=weightsA)
+    statsB = sms.DescrStatsW(groupB, weights=weightsB)
+    diff = statsA.mean - statsB.mean
+    cm = sms.CompareMeans(statsA, statsB)
+    zlow, zupp = cm.zconfint_diff(alpha=alpha, usevar='unequal')
+    tlow, tupp = cm.tconfint_diff(alpha=alpha, usevar='unequal')
+    ztstat, zpvalue = cm.ztest_ind(alternative="larger", usevar="unequal")
+    ttstat, tpvalue, dof = cm.ttest_ind(alternative="larger", usevar="unequal")
+    return pd.Series({
+        "nobs_A": groupA.size,
+        "nobs_B": groupB.size,
+        "diff": diff,
+        "diff_percentage": diff / statsA.mean * 100,
+        "std_error": np.sqrt(statsA.std_mean**2 + statsB.std_mean**2),
+        "zconfint_low": zlow,
+        "zconfint_upp": zupp,
+        "tconfint_low": tlow,
+        "tconfint_upp": tupp,
+        "ztstat": ztstat,
+        "zpvalue": zpvalue,
+        "zreject": zpvalue <= alpha,
+        "ttstat": ttstat,
+        "tpvalue": tpvalue,
+        "tdf": dof,
+        "treject": tpvalue <= alpha,
+    })
+
+
+def power_analysis(groupA, groupB, alpha=0.05, powers=(0.8, 0.9, 0.95)):
+    """Returns the sample sizes needed for each of @powers and the power
+    reached by the available samples.
+    """
+    from statsmodels.stats.power import tt_ind_solve_power, TTestIndPower
+
+    effect_size = (groupA.mean() - groupB.mean()) / groupB.std()
+    ratio = len(groupB) / len(groupA)
+    nof_samplesA = [
+        tt_ind_solve_power(
+            effect_size=effect_size,
+            alpha=alpha,
+            power=power,
+            ratio=ratio,
+            alternative="larger"
+        ) for power in powers
+    ]
+    samples = pd.DataFrame({
+        "power": powers,
+        "nobs_A": nof_samplesA,
+        "nobs_B": [n * ratio for n in nof_samplesA],
+    })
+    power = TTestIndPower().power(
+        effect_size=effect_size,
+        alpha=alpha,
+        nobs1=groupA.size,
+        ratio=ratio,
+        alternative="larger"
+    )
+    return samples, power
@@ -0,0 +1,315 @@
+"""Bitmap indexes over the recurring population filters of the survey.
+
+Each categorical value gets an equality bitmap and each numeric column gets
+range-encoded bitmaps (`col < edge` and `col <= edge`) at a fixed set of
+edges, so any comparison against an edge is a single bitmap. Bitmaps are
+packed eight rows per byte, combined with bitwise AND/OR/NOT and counted
+with a popcount, so subpopulation sizes and probabilities never touch the
+rows. The index is persisted compressed next to the cached survey.
+
+    idx = load_or_build(db, path)
+    juniors = (
+        idx.eq(work_contract_type, "Full-Time") &
+        idx.gt(salary_monthly_NETO, MINWAGE_IN_ARG) &
+        idx.le(profile_years_experience, 5) &
+        idx.ne(salary_in_usd, DOLLARIZED)
+    )
+    juniors.count()
+    db[juniors.mask()]
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .data import (
+    MINWAGE_IN_ARG,
+    profile_age,
+    profile_gender,
+    profile_studies_level,
+    profile_years_experience,
+    salary_in_usd,
+    salary_monthly_BRUTO,
+    salary_monthly_NETO,
+    work_contract_type,
+    work_province,
+)
+
+INDEX_VERSION = 1
+
+CATEGORICAL = [
+    work_contract_type,
+    salary_in_usd,
+    profile_gender,
+    profile_studies_level,
+    work_province,
+]
+NUMERIC = {
+    salary_monthly_NETO: [1000, MINWAGE_IN_ARG, 50000, 100000, 200000],
+    salary_monthly_BRUTO: [1000, MINWAGE_IN_ARG, 50000, 100000, 200000],
+    profile_years_experience: [0, 1, 2, 3, 5, 10, 20, 30, 50],
+    profile_age: [18, 25, 30, 35, 40, 50, 100],
+}
+
+if hasattr(np, "bitwise_count"):
+    _popcount = np.bitwise_count
+else:
+    _POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], np.uint8)
+
+    def _popcount(bits):
+        return _POPCOUNT[bits]
+
+
+class Bitmap:
+    """Set of rows packed as bits."""
+
+    __slots__ = ("bits", "n")
+
+    def __init__(self, bits, n):
+        self.bits = bits
+        self.n = n
+
+    @classmethod
+    def from_mask(cls, mask):
+        mask = np.asarray(mask, dtype=bool)
+        return cls(np.packbits(mask), mask.size)
+
+    @classmethod
+    def empty(cls, n):
+        return cls(np.zeros((n + 7) // 8, dtype=np.uint8), n)
+
+    def __and__(self, other):
+        return Bitmap(self.bits & other.bits, self.n)
+
+    def __or__(self, other):
+        return Bitmap(self.bits | other.bits, self.n)
+
+    def __xor__(self, other):
+        return Bitmap(self.bits ^ other.bits, self.n)
+
+    def __invert__(self):
+        bits = ~self.bits
+        tail = self.n % 8
+        if tail:
+            bits[-1] &= (0xFF << (8 - tail)) & 0xFF
+        return Bitmap(bits, self.n)
+
+    def count(self):
+        return int(_popcount(self.bits).sum(dtype=np.int64))
+
+    def mask(self):
+        """Returns the bitmap as a boolean array, one entry per row."""
+        return np.unpackbits(self.bits, count=self.n).astype(bool)
+
+    def __len__(self):
+        return self.n
+
+    def __repr__(self):
+        return f"Bitmap({self.count()}/{self.n})"
+
+
+def _key(value):
+    return None if pd.isna(value) else str(value)
+
+
+class BitmapIndex:
+    """Equality bitmaps per categorical value and range-encoded bitmaps per
+    numeric edge.
+    """
+
+    def __init__(self, n, categorical=None, numeric=None):
+        self.n = n
+        # categorical[col][value] -> Bitmap, None is the key of missing values
+        self.categorical = categorical or {}
+        # numeric[col] -> (edges, lt bitmaps, le bitmaps, notna bitmap)
+        self.numeric = numeric or {}
+
+    @classmethod
+    def build(cls, db, categorical=CATEGORICAL, numeric=NUMERIC):
+        index = cls(len(db))
+        for col in categorical:
+            index.add_categorical(db, col)
+        for col, edges in numeric.items():
+            index.add_edges(db, col, edges)
+        return index
+
+    def covers(self, categorical=(), numeric=None):
+        """Whether the index has every column of @categorical and every edge
+        of @numeric.
+        """
+        if any(col not in self.categorical for col in categorical):
+            return False
+        return all(
+            col in self.numeric and {float(edge) for edge in edges} <= set(self.numeric[col][0])
+            for col, edges in (numeric or {}).items()
+        )
+
+    def add_categorical(self, db, col):
+        """Indexes each value of @col of @db with an equality bitmap."""
+        codes, uniques = pd.factorize(db[col])
+        self.categorical[col] = {
+            _key(value): Bitmap.from_mask(codes == code)
+            for code, value in enumerate(uniques)
+        }
+        if (codes == -1).any():
+            self.categorical[col][None] = Bitmap.from_mask(codes == -1)
+
+    def add_edges(self, db, col, edges):
+        """Indexes @col of @db at @edges too, e.g. for a data dependent
+        threshold such as a mean that is reused across queries. Use `save`,
+        or pass the edges to `load_or_build`, to persist them.
+        """
+        values = db[col].to_numpy(dtype=float)
+        old_edges, lt, le, notna = self.numeric.get(
+            col, ([], [], [], Bitmap.from_mask(~np.isnan(values)))
+        )
+        merged = sorted(set(old_edges) | {float(edge) for edge in edges})
+        old = dict(zip(old_edges, zip(lt, le)))
+        lt, le = [], []
+        for edge in merged:
+            if edge in old:
+                edge_lt, edge_le = old[edge]
+            else:
+                edge_lt = Bitmap.from_mask(values < edge)
+                edge_le = Bitmap.from_mask(values <= edge)
+            lt.append(edge_lt)
+            le.append(edge_le)
+        self.numeric[col] = (merged, lt, le, notna)
+
+    def _range(self, col, edge):
+        if col not in self.numeric:
+            raise KeyError(f"{col} is not indexed as numeric.")
+        edges, lt, le, notna = self.numeric[col]
+        try:
+            i = edges.index(float(edge))
+        except ValueError:
+            raise ValueError(
+                f"{edge} is not an edge of {col}. Indexed edges: {edges}."
+            )
+        return lt[i], le[i], notna
+
+    def eq(self, col, value):
+        values = self.categorical[col]
+        bitmap = values.get(_key(value))
+        return bitmap if bitmap is not None else Bitmap.empty(self.n)
+
+    def ne(self, col, value):
+        """Rows whose @col differs from @value, including missing ones as
+        pandas does.
+        """
+        return ~self.eq(col, value)
+
+    def isin(self, col, values):
+        result = Bitmap.empty(self.n)
+        for value in values:
+            result = result | self.eq(col, value)
+        return result
+
+    def lt(self, col, edge):
+        return self._range(col, edge)[0]
+
+    def le(self, col, edge):
+        return self._range(col, edge)[1]
+
+    def gt(self, col, edge):
+        _, le, notna = self._range(col, edge)
+        return notna & ~le
+
+    def ge(self, col, edge):
+        lt, _, notna = self._range(col, edge)
+        return notna & ~lt
+
+    def between(self, col, low, high):
+        """Rows with @low < @col <= @high."""
+        return self.gt(col, low) & self.le(col, high)
+
+    def probability(self, event, given=None):
+        """Returns P(@event | @given) from popcounts alone."""
+        if given is None:
+            return event.count() / self.n
+        return (event & given).count() / given.count()
+
+    def save(self, path, fingerprint=None):
+        arrays = {}
+        meta = {
+            "version": INDEX_VERSION,
+            "n": self.n,
+            "fingerprint": fingerprint,
+            "categorical": {},
+            "numeric": {},
+        }
+        for i, (col, values) in enumerate(self.categorical.items()):
+            keys = list(values)
+            meta["categorical"][col] = keys
+            for j, key in enumerate(keys):
+                arrays[f"c{i}_{j}"] = values[key].bits
+        for i, (col, (edges, lt, le, notna)) in enumerate(self.numeric.items()):
+            meta["numeric"][col] = edges
+            arrays[f"n{i}_notna"] = notna.bits
+            for j in range(len(edges)):
+                arrays[f"n{i}_{j}_lt"] = lt[j].bits
+                arrays[f"n{i}_{j}_le"] = le[j].bits
+        arrays["meta"] = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)
+        tmp = path + ".tmp.npz"
+        np.savez_compressed(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, fingerprint=None):
+        """Returns the index saved in @path or None if it is missing or was
+        built from a different survey.
+        """
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as arrays:
+            meta = json.loads(arrays["meta"].tobytes())
+            if meta["version"] != INDEX_VERSION or meta["fingerprint"] != fingerprint:
+                return None
+            n = meta["n"]
+            index = cls(n)
+            for i, (col, keys) in enumerate(meta["categorical"].items()):
+                index.categorical[col] = {
+                    key: Bitmap(arrays[f"c{i}_{j}"], n)
+                    for j, key in enumerate(keys)
+                }
+            for i, (col, edges) in enumerate(meta["numeric"].items()):
+                index.numeric[col] = (
+                    edges,
+                    [Bitmap(arrays[f"n{i}_{j}_lt"], n) for j in range(len(edges))],
+                    [Bitmap(arrays[f"n{i}_{j}_le"], n) for j in range(len(edges))],
+                    Bitmap(arrays[f"n{i}_notna"], n),
+                )
+        return index
+
+
+def index_path(source):
+    """Returns where the index of the survey at @source is persisted."""
+    return os.path.splitext(source)[0] + ".bitmaps.npz"
+
+
+def source_fingerprint(source):
+    stat = os.stat(source)
+    return [stat.st_size, int(stat.st_mtime)]
+
+
+def load_or_build(db, source, categorical=CATEGORICAL, numeric=NUMERIC):
+    """Returns the index of @db, read from next to the local survey file
+    @source when it is up to date, or built and saved there otherwise. A
+    saved index missing some of the @categorical columns or @numeric edges is
+    extended with them and saved again.
+    """
+    path = index_path(source)
+    fingerprint = source_fingerprint(source)
+    index = BitmapIndex.load(path, fingerprint)
+    if index is None or index.n != len(db):
+        index = BitmapIndex.build(db, categorical, numeric)
+        index.save(path, fingerprint)
+    elif not index.covers(categorical, numeric):
+        for col in categorical:
+            if col not in index.categorical:
+                index.add_categorical(db, col)
+        for col, edges in numeric.items():
+            index.add_edges(db, col, edges)
+        index.save(path, fingerprint)
+    return index
@@ -0,0 +1,143 @@
+"""Content-addressed on-disk cache for rendered figures and result tables.
+
+Entries are keyed by a hash of the columns of the input frame that a figure or
+table depends on plus the parameters used to build it, so a rerun over
+unchanged data skips the rendering and aggregation altogether. Each hit
+touches the entry and, once the cache goes over its size limit, the least
+recently used entries are removed.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+CACHE_VERSION = 1
+MAX_BYTES = 256 * 1024 * 1024
+
+
+def frame_key(df, name, **params):
+    """Returns the hex digest identifying @name computed over @df with
+    @params.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(
+        {
+            "version": CACHE_VERSION,
+            "name": name,
+            "columns": [str(col) for col in df.columns],
+            "dtypes": [str(dtype) for dtype in df.dtypes],
+            "params": params,
+        },
+        sort_keys=True,
+        default=str
+    ).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Directory of cached files bounded to @max_bytes with LRU eviction."""
+
+    def __init__(self, directory, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, f"{key}.{suffix}")
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _write(self, path, write):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.evict()
+
+    def fetch(self, key, suffix, dest):
+        """Copies the cached file into @dest and returns whether it was a hit."""
+        path = self._path(key, suffix)
+        if not self._touch(path):
+            return False
+        try:
+            shutil.copyfile(path, dest)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def store(self, key, suffix, src):
+        self._write(self._path(key, suffix), lambda tmp: shutil.copyfile(src, tmp))
+
+    def load_table(self, key):
+        """Returns the cached table or None if it is not in the cache."""
+        path = self._path(key, "pkl")
+        if not self._touch(path):
+            return None
+        try:
+            return pd.read_pickle(path)
+        except FileNotFoundError:
+            return None
+
+    def save_table(self, key, table):
+        self._write(self._path(key, "pkl"), lambda tmp: pd.to_pickle(table, tmp))
+
+    def table(self, key, compute):
+        """Returns the cached result for @key, computing and storing it with
+        @compute on a miss. Results may be tables or tuples of them.
+        """
+        table = self.load_table(key)
+        if table is None:
+            table = compute()
+            self.save_table(key, table)
+        return table
+
+    def size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".tmp") or not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        """Removes the least recently used entries until the cache fits in
+        its size limit.
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
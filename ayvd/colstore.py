@@ -0,0 +1,171 @@
+"""Memory-mapped column store of the numeric and categorical survey columns.
+
+The columns are written into a single flat file: a small JSON schema header
+followed by each column as a raw, 64-byte aligned array (float64 for numeric
+columns and int32 codes for categorical ones, with -1 for missing values).
+Workers open it with `np.memmap`, so any number of processes read the same
+page-cache copy, and a `ColumnStore` pickles as its path alone, making it
+cheap to hand to a process pool.
+
+    store = write_store(db, "survey.columns")
+    with ProcessPoolExecutor() as executor:
+        executor.map(work, [store] * n)   # each worker maps the same file
+"""
+import json
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+from .data import (
+    profile_age,
+    profile_gender,
+    profile_studies_level,
+    profile_years_experience,
+    salary_in_usd,
+    salary_monthly_BRUTO,
+    salary_monthly_NETO,
+    work_contract_type,
+    work_province,
+)
+
+MAGIC = b"AYVDCOL1"
+ALIGNMENT = 64
+
+NUMERIC = [
+    salary_monthly_NETO,
+    salary_monthly_BRUTO,
+    profile_age,
+    profile_years_experience,
+]
+CATEGORICAL = [
+    work_contract_type,
+    salary_in_usd,
+    profile_gender,
+    profile_studies_level,
+    work_province,
+]
+
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_store(db, path, numeric=NUMERIC, categorical=CATEGORICAL):
+    """Writes the @numeric and @categorical columns of @db into @path and
+    returns the opened store.
+    """
+    arrays = {}
+    columns = {}
+    for col in numeric:
+        arrays[col] = db[col].to_numpy(dtype=np.float64)
+        columns[col] = {"kind": "numeric", "dtype": "<f8"}
+    for col in categorical:
+        codes, uniques = pd.factorize(db[col])
+        arrays[col] = codes.astype(np.int32)
+        columns[col] = {
+            "kind": "categorical",
+            "dtype": "<i4",
+            "categories": [str(value) for value in uniques],
+        }
+
+    # The offsets depend on the header length, so they are computed relative
+    # to the first aligned byte after it.
+    offset = 0
+    for col, array in arrays.items():
+        columns[col]["offset"] = offset
+        offset = _align(offset + array.nbytes)
+    header = json.dumps({"n": len(db), "columns": columns}).encode()
+    data_start = _align(len(MAGIC) + 8 + len(header))
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for col, array in arrays.items():
+            f.seek(data_start + columns[col]["offset"])
+            f.write(np.ascontiguousarray(array, dtype=columns[col]["dtype"]).tobytes())
+    os.replace(tmp, path)
+    return ColumnStore(path)
+
+
+class ColumnStore:
+    """Read-only view of a column store file through `np.memmap`."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a column store.")
+            (length,) = struct.unpack("<Q", f.read(8))
+            schema = json.loads(f.read(length))
+        self.n = schema["n"]
+        self.schema = schema["columns"]
+        self._data_start = _align(len(MAGIC) + 8 + length)
+        self._arrays = {}
+
+    def __reduce__(self):
+        return (ColumnStore, (self.path,))
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def columns(self):
+        return list(self.schema)
+
+    def array(self, col):
+        """Returns the memory-mapped array of @col, codes for categoricals."""
+        if col not in self._arrays:
+            spec = self.schema[col]
+            self._arrays[col] = np.memmap(
+                self.path,
+                dtype=spec["dtype"],
+                mode="r",
+                offset=self._data_start + spec["offset"],
+                shape=(self.n,)
+            )
+        return self._arrays[col]
+
+    def categories(self, col):
+        return self.schema[col]["categories"]
+
+    def code(self, col, value):
+        """Returns the integer code of @value in the categorical @col, or -1."""
+        try:
+            return self.categories(col).index(value)
+        except ValueError:
+            return -1
+
+    def series(self, col):
+        spec = self.schema[col]
+        if spec["kind"] == "categorical":
+            return pd.Series(
+                pd.Categorical.from_codes(self.array(col), spec["categories"]),
+                name=col
+            )
+        return pd.Series(self.array(col), name=col, copy=False)
+
+    def frame(self, columns=None):
+        return pd.concat(
+            [self.series(col) for col in columns or self.columns], axis=1
+        )
+
+
+def store_path(source):
+    """Returns where the column store of the survey at @source is written."""
+    return os.path.splitext(source)[0] + ".columns"
+
+
+def load_or_write(db, source, numeric=NUMERIC, categorical=CATEGORICAL):
+    """Returns the column store of @db next to the local survey file
+    @source, writing it again when it is older than @source.
+    """
+    path = store_path(source)
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(source):
+        store = ColumnStore(path)
+        if store.n == len(db) and set(numeric + categorical) <= set(store.columns):
+            return store
+    return write_store(db, path, numeric, categorical)
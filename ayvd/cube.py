@@ -0,0 +1,145 @@
+"""Materialized cube of counts and salary sums over categorical dimensions.
+
+`Cube.build` factorizes each dimension once and fills dense arrays, indexed
+by the integer codes of the dimensions, with the number of rows, the number
+of values of the measure, their sum and their sum of squares in a single
+`np.bincount` pass. Any grouping over a subset of the dimensions is then a sum
+over the other axes, so roll-ups, slices and dices never go back to the rows.
+Missing values of a dimension are a category of their own, as in
+`groupby(..., dropna=False)`, so every roll-up covers all the rows. Sums are
+taken around the global mean of the measure to keep the variances accurate.
+
+    cube = Cube.build(df, [profile_age_segment, work_contract_type, salary_in_usd])
+    cube.rollup([profile_age_segment, work_contract_type]).table()["size"]
+    cube.slice(salary_in_usd, "dolarizado").table()
+"""
+import numpy as np
+import pandas as pd
+
+from .data import salary_monthly_NETO
+
+MEASURES = ("size", "count", "sum", "sumsq")
+
+
+class Cube:
+    """Dense cells of size, count, sum and sum of squares by @dims."""
+
+    def __init__(self, dims, categories, cells, shift, measure):
+        self.dims = list(dims)
+        self.categories = {dim: list(categories[dim]) for dim in self.dims}
+        self.cells = cells
+        self.shift = shift
+        self.measure = measure
+
+    @classmethod
+    def build(cls, df, dims, measure=salary_monthly_NETO):
+        """Returns the cube of @measure over @dims, with the missing values
+        of each dimension as their last category.
+        """
+        dims = list(dims)
+        codes, categories = [], {}
+        for dim in dims:
+            code, uniques = pd.factorize(df[dim], sort=True, use_na_sentinel=False)
+            codes.append(code)
+            categories[dim] = uniques
+        shape = tuple(len(categories[dim]) for dim in dims)
+        flat = np.ravel_multi_index(codes, shape) if dims \
+            else np.zeros(len(df), dtype=np.int64)
+        size = int(np.prod(shape))
+
+        values = df[measure].to_numpy(dtype=float)
+        has_value = ~np.isnan(values)
+        shift = float(values[has_value].mean()) if has_value.any() else 0.0
+        centered = np.where(has_value, values - shift, 0.0)
+        cells = {
+            "size": np.bincount(flat, minlength=size),
+            "count": np.bincount(flat, weights=has_value, minlength=size),
+            "sum": np.bincount(flat, weights=centered, minlength=size),
+            "sumsq": np.bincount(flat, weights=centered**2, minlength=size),
+        }
+        cells = {name: cell.reshape(shape) for name, cell in cells.items()}
+        return cls(dims, categories, cells, shift, measure)
+
+    def _axis(self, dim):
+        try:
+            return self.dims.index(dim)
+        except ValueError:
+            raise KeyError(f"{dim} is not a dimension of the cube: {self.dims}.")
+
+    def _position(self, dim, value):
+        for position, category in enumerate(self.categories[dim]):
+            if category == value or pd.isna(category) and pd.isna(value):
+                return position
+        raise KeyError(f"{value!r} is not a value of {dim}.")
+
+    def rollup(self, dims):
+        """Returns the cube grouped by @dims only, summing the other axes."""
+        dims = list(dims)
+        axes = tuple(self._axis(dim) for dim in self.dims if dim not in dims)
+        cells = {name: cell.sum(axis=axes) for name, cell in self.cells.items()}
+        kept = [dim for dim in self.dims if dim in dims]
+        order = [kept.index(dim) for dim in dims]
+        cells = {name: np.transpose(cell, order) for name, cell in cells.items()}
+        return Cube(dims, self.categories, cells, self.shift, self.measure)
+
+    def slice(self, dim, value):
+        """Returns the cube of the rows with @dim equal to @value, without the
+        @dim axis.
+        """
+        axis, position = self._axis(dim), self._position(dim, value)
+        cells = {
+            name: np.take(cell, position, axis=axis)
+            for name, cell in self.cells.items()
+        }
+        dims = [other for other in self.dims if other != dim]
+        return Cube(dims, self.categories, cells, self.shift, self.measure)
+
+    def dice(self, selection):
+        """Returns the cube restricted to the values of @selection, a dict
+        from dimension to the values to keep.
+        """
+        cells = self.cells
+        categories = dict(self.categories)
+        for dim, values in selection.items():
+            axis = self._axis(dim)
+            positions = [self._position(dim, value) for value in values]
+            cells = {
+                name: np.take(cell, positions, axis=axis)
+                for name, cell in cells.items()
+            }
+            categories[dim] = list(values)
+        return Cube(self.dims, categories, cells, self.shift, self.measure)
+
+    def total(self):
+        """Returns the measures of the whole cube as a Series."""
+        return self.rollup([]).table().iloc[0]
+
+    def table(self, dropempty=True):
+        """Returns one row per cell with its size, count, sum, mean and std."""
+        size = self.cells["size"]
+        count = self.cells["count"]
+        total = self.cells["sum"]
+        sumsq = self.cells["sumsq"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+            var = (sumsq - total * mean) / (count - 1)
+        table = pd.DataFrame({
+            "size": size.ravel().astype(np.int64),
+            "count": count.ravel().astype(np.int64),
+            "sum": (total + self.shift * count).ravel(),
+            "mean": (mean + self.shift).ravel(),
+            "std": np.sqrt(np.clip(var, 0, None)).ravel(),
+        }, index=self._index())
+        if dropempty:
+            table = table[table["size"] > 0]
+        return table
+
+    def _index(self):
+        if not self.dims:
+            return pd.Index([self.measure])
+        if len(self.dims) == 1:
+            dim = self.dims[0]
+            return pd.Index(self.categories[dim], name=dim)
+        return pd.MultiIndex.from_product(
+            [self.categories[dim] for dim in self.dims], names=self.dims
+        )
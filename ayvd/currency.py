@@ -0,0 +1,139 @@
+"""Salaries on a common currency and period through an as-of rate index.
+
+The index is read from a local CSV with one row per currency and date:
+
+    date,currency,rate,cpi
+    2020-01-01,ARS,1,100.0
+    2020-01-01,USD,59.9,257.9
+    ...
+
+where `rate` is the value of one unit of the currency in ARS and `cpi` the
+consumer price index of that currency. Rows are sorted once by currency and
+date into a single composite key, so the rate in force at the date of every
+salary, the last one on or before it, is found by one `np.searchsorted` over
+all the rows regardless of their currency. Indexes are kept in memory per file
+and reloaded only when the file changes.
+
+The survey reports every salary in ARS, including the ones that are
+dollarized, so both can be compared once normalized instead of dropping the
+dollarized salaries:
+
+    rates = load_rates("rates.csv")
+    df = normalize(db, rates, date="2020-06-30", base="USD", period="2020-12-31")
+    df.groupby(salary_in_usd)[f"{salary_monthly_NETO}_USD"].describe()
+"""
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+
+from .data import salary_monthly_BRUTO, salary_monthly_NETO
+
+LOCAL_CURRENCY = "ARS"
+
+
+class RateIndex:
+    """Sorted rates and price indexes of each currency of @table."""
+
+    def __init__(self, table):
+        table = table.dropna(subset=["date", "currency", "rate"])
+        codes, currencies = pd.factorize(table["currency"], sort=True)
+        days = to_days(table["date"])
+        order = np.lexsort((days, codes))
+        self.currencies = pd.Index(currencies)
+        self.keys = _key(codes[order], days[order])
+        self.rates = table["rate"].to_numpy(dtype=float)[order]
+        self.cpi = table["cpi"].to_numpy(dtype=float)[order] if "cpi" in table \
+            else np.full(len(order), np.nan)
+        if np.any(np.diff(self.keys) == 0):
+            raise ValueError("The rate table has repeated dates for a currency.")
+
+    @classmethod
+    def read_csv(cls, path):
+        return cls(pd.read_csv(path, parse_dates=["date"]))
+
+    def codes(self, currencies):
+        """Returns the integer code of each of @currencies, a single value or
+        an array.
+        """
+        uniques, inverse = np.unique(
+            np.atleast_1d(np.asarray(currencies, dtype=object)), return_inverse=True
+        )
+        codes = self.currencies.get_indexer(uniques)
+        if (codes < 0).any():
+            missing = sorted(map(str, uniques[codes < 0]))
+            raise KeyError(f"Currencies without rates: {missing}.")
+        return codes[inverse].astype(np.int64)
+
+    def lookup(self, codes, days):
+        """Returns the rate and price index in force at each of @days, the
+        last ones on or before it, for the currencies of @codes, one per day
+        or a single one for all. Both are NaN for days before the first rate
+        of their currency.
+        """
+        positions = np.searchsorted(self.keys, _key(codes, days), side="right") - 1
+        # A position of another currency means the day is before its first rate.
+        found = (positions >= 0) & (self.keys[np.clip(positions, 0, None)] >> 32 == codes)
+        positions = np.where(found, positions, 0)
+        return (
+            np.where(found, self.rates[positions], np.nan),
+            np.where(found, self.cpi[positions], np.nan),
+        )
+
+
+def to_days(dates):
+    """Returns @dates as integer days since the epoch."""
+    dates = pd.to_datetime(np.atleast_1d(np.asarray(dates)))
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+def _key(codes, days):
+    return (np.asarray(codes, dtype=np.int64) << 32) + (days + 2**31)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_rates(path, mtime, size):
+    return RateIndex.read_csv(path)
+
+
+def load_rates(path):
+    """Returns the RateIndex of the CSV at @path, cached in memory until the
+    file changes.
+    """
+    stat = os.stat(path)
+    return _load_rates(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def normalize(
+    df,
+    rates,
+    date,
+    base="USD",
+    period=None,
+    currency=LOCAL_CURRENCY,
+    columns=(salary_monthly_NETO, salary_monthly_BRUTO),
+    suffix=None,
+):
+    """Returns @df with every column of @columns converted to @base currency
+    as new columns named `<column>_<suffix>`, @base by default.
+
+    @date and @currency are either column names of @df or a single value for
+    all the rows. Each salary is converted with the rates in force at its
+    date and, when @period is given, taken to the prices of @period with the
+    price index of @base.
+    """
+    days = to_days(df[date] if date in df else date)
+    source = rates.codes(df[currency] if currency in df else currency)
+    target = rates.codes(base)
+    source_rate, _ = rates.lookup(source, days)
+    base_rate, base_cpi = rates.lookup(target, days)
+    factor = source_rate / base_rate
+    if period is not None:
+        _, period_cpi = rates.lookup(target, to_days(period))
+        factor = factor * period_cpi / base_cpi
+    factor = np.broadcast_to(factor, len(df))
+    return df.assign(**{
+        f"{col}_{suffix or base}": df[col].to_numpy(dtype=float) * factor
+        for col in columns
+    })
@@ -0,0 +1,141 @@
+"""Survey loading and the curation helpers shared by the lab analyses."""
+import os
+
+import numpy as np
+import pandas as pd
+
+URL = "https://cs.famaf.unc.edu.ar/~mteruel/datasets/diplodatos/sysarmy_survey_2020_processed.csv"
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ayvd")
+
+MINWAGE_IN_ARG = 18600
+
+# random variables
+profile_age = "profile_age"
+profile_gender = "profile_gender"
+profile_studies_level = "profile_studies_level"
+profile_years_experience = "profile_years_experience"
+salary_in_usd = "salary_in_usd"
+salary_monthly_BRUTO = "salary_monthly_BRUTO"
+salary_monthly_NETO = "salary_monthly_NETO"
+tools_programming_language = "tools_programming_languages"
+work_contract_type = "work_contract_type"
+work_province = "work_province"
+
+# derived columns
+cured_programming_languages = "cured_programming_languages"
+programming_language = "programming_language"
+profile_age_segment = "profile_age_segment"
+region = "region"
+
+DOLLARIZED = "Mi sueldo está dolarizado"
+
+new_regions = {
+    'Jujuy': 'Nordeste y Noreste',
+    'Salta': 'Nordeste y Noreste',
+    'Tucumán': 'Nordeste y Noreste',
+    'Catamarca': 'Nordeste y Noreste',
+    'La Rioja': 'Nordeste y Noreste',
+    'Corrientes': 'Nordeste y Noreste',
+    'Entre Ríos': 'Nordeste y Noreste',
+    'Chaco': 'Nordeste y Noreste',
+    'Misiones': 'Nordeste y Noreste',
+    'Formosa': 'Nordeste y Noreste',
+    'GBA': 'Buenos Aires',
+    'Provincia de Buenos Aires': 'Buenos Aires',
+    'Córdoba': 'Centro',
+    'Santa Fe': 'Centro',
+    'La Pampa': 'Centro',
+    'Santiago del Estero': 'Centro',
+    'San Luis': 'Cuyo y Patagonia',
+    'Mendoza': 'Cuyo y Patagonia',
+    'San Juan': 'Cuyo y Patagonia',
+    'Tierra del Fuego': 'Cuyo y Patagonia',
+    'Santa Cruz': 'Cuyo y Patagonia',
+    'Río Negro': 'Cuyo y Patagonia',
+    'Chubut': 'Cuyo y Patagonia',
+    'Neuquén': 'Cuyo y Patagonia',
+}
+region_order = [
+    'Nordeste y Noreste',
+    'Centro',
+    'Buenos Aires',
+    'Ciudad Autónoma de Buenos Aires',
+    'Cuyo y Patagonia',
+]
+
+
+def fetch_survey(url=URL, cache_dir=CACHE_DIR):
+    """Downloads @url once into @cache_dir and returns the local path."""
+    path = os.path.join(cache_dir, os.path.basename(url))
+    if not os.path.exists(path):
+        import urllib.request
+
+        os.makedirs(cache_dir, exist_ok=True)
+        urllib.request.urlretrieve(url, path + ".part")
+        os.replace(path + ".part", path)
+    return path
+
+
+def load_survey(source=None, cache_dir=CACHE_DIR):
+    """Returns the survey read from @source, or from the cached download."""
+    if source is None:
+        source = fetch_survey(cache_dir=cache_dir)
+    return pd.read_csv(source)
+
+
+def split_languages(languages_str):
+    if not isinstance(languages_str, str):
+        return []
+
+    for label in ['ninguno de los anteriores', 'ninguno']:
+        languages_str = languages_str.lower().replace(label, '')
+
+    return [lang.strip().replace(',', '') for lang in languages_str.split()]
+
+
+def stack_col(df, stacked_col, unstacked_col):
+    return df[unstacked_col] \
+        .apply(pd.Series).stack()\
+        .reset_index(level=-1, drop=True).to_frame()\
+        .join(df)\
+        .rename(columns={0: stacked_col})
+
+
+def add_cured_col(df, uncured_col, cured_col, cure_func):
+    df.loc[:, cured_col] = df[uncured_col] \
+        .apply(cure_func)
+    return df
+
+
+def clean_outliers(dataset, column_name, n_std=2.5):
+    """Returns dataset removing the outlier rows from column @column_name."""
+    interesting_col = dataset[column_name]
+    mask_outlier = (
+        np.abs(interesting_col - interesting_col.mean()) <= (n_std * interesting_col.std()))
+    return dataset[mask_outlier]
+
+
+def to_categorical(column, bin_size=10, min_cut=0, max_cut=50):
+    if min_cut is None:
+        min_cut = int(round(column.min())) - 1
+    value_max = int(np.ceil(column.max()))
+    max_cut = min(max_cut, value_max)
+    intervals = [(x, x + bin_size) for x in range(min_cut, max_cut, bin_size)]
+    if max_cut != value_max:
+        intervals.append((max_cut, value_max))
+    return pd.cut(column, pd.IntervalIndex.from_tuples(intervals))
+
+
+def explode_languages(db):
+    """Returns @db with one row per employee and programming language."""
+    return db.copy() \
+        .pipe(
+            add_cured_col,
+            cured_col=cured_programming_languages,
+            uncured_col=tools_programming_language,
+            cure_func=split_languages
+        ).pipe(
+            stack_col,
+            stacked_col=programming_language,
+            unstacked_col=cured_programming_languages
+        ).reset_index(drop=True)
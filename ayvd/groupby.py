@@ -0,0 +1,149 @@
+"""Multi-core group-by over a memory-mapped `ColumnStore`.
+
+Rows are range-partitioned and each partition is aggregated in a worker
+process straight from the shared memory map: the group keys are the integer
+codes of the categorical columns, combined into a single code, and each
+partition returns its per-group count, sum, centered sum of squares, min and
+max computed with `np.bincount`. The partials are then merged exactly, the
+sums of squares through the parallel variance formula, into the same mean,
+std, min, max and count that `DataFrame.groupby(...).agg` returns.
+
+Multi-valued columns such as the programming languages are grouped by
+writing the exploded frame into its own store first.
+
+    store = write_store(df, "langs.columns", categorical=[programming_language, ...])
+    group_agg(store, [programming_language], salary_monthly_NETO, workers=8)
+"""
+import operator
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def _filter_mask(store, filters, start, stop):
+    """Evaluates @filters, a list of (col, op, value), over rows
+    [@start, @stop) of @store.
+    """
+    mask = np.ones(stop - start, dtype=bool)
+    for col, op, value in filters:
+        array = store.array(col)[start:stop]
+        if store.schema[col]["kind"] == "categorical":
+            if op == "isin":
+                codes = [store.code(col, v) for v in value]
+                mask &= np.isin(array, codes)
+                continue
+            # Missing values have code -1, which never matches a category,
+            # so != keeps them as pandas does.
+            value = store.code(col, value)
+            if op not in ("==", "!="):
+                raise ValueError(f"Categorical {col} only supports ==, != and isin.")
+        mask &= OPERATORS[op](array, value)
+    return mask
+
+
+def _partial(store, keys, value, start, stop, filters):
+    """Returns the count, sum, centered sum of squares, min and max of
+    @value per group over rows [@start, @stop).
+    """
+    sizes = [len(store.categories(col)) for col in keys]
+    n_groups = int(np.prod(sizes))
+    values = np.asarray(store.array(value)[start:stop], dtype=np.float64)
+
+    code = np.zeros(stop - start, dtype=np.int64)
+    valid = ~np.isnan(values)
+    for col, size in zip(keys, sizes):
+        codes = store.array(col)[start:stop]
+        valid &= codes >= 0
+        code = code * size + codes
+    if filters:
+        valid &= _filter_mask(store, filters, start, stop)
+    code = code[valid]
+    values = values[valid]
+
+    count = np.bincount(code, minlength=n_groups)
+    total = np.bincount(code, weights=values, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+    m2 = np.bincount(code, weights=(values - mean[code])**2, minlength=n_groups)
+    low = np.full(n_groups, np.inf)
+    high = np.full(n_groups, -np.inf)
+    np.minimum.at(low, code, values)
+    np.maximum.at(high, code, values)
+    return count, total, m2, low, high
+
+
+def merge_partials(partials):
+    """Merges per-partition (count, sum, m2, min, max) into the totals."""
+    counts, totals, m2s, lows, highs = (np.stack(part) for part in zip(*partials))
+    count = counts.sum(axis=0)
+    total = totals.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+        part_means = totals / counts
+    deviation = np.where(counts > 0, counts * (part_means - mean)**2, 0.0)
+    m2 = m2s.sum(axis=0) + deviation.sum(axis=0)
+    return count, total, m2, lows.min(axis=0), highs.max(axis=0)
+
+
+def partitions(n, parts):
+    bounds = np.linspace(0, n, parts + 1).astype(int)
+    return [(start, stop) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+
+def group_agg(store, keys, value, filters=(), workers=None, parts=None, executor=None):
+    """Returns count, sum, mean, std, min and max of @value grouped by the
+    categorical @keys of @store, only over the rows matching @filters.
+
+    The rows are split in @parts ranges (4 per worker by default) that are
+    aggregated in @workers processes, or in @executor when given.
+    """
+    keys = list(keys)
+    filters = list(filters)
+    workers = workers or os.cpu_count() or 1
+    ranges = partitions(len(store), parts or 4 * workers)
+
+    if executor is None and workers == 1:
+        partials = [
+            _partial(store, keys, value, start, stop, filters)
+            for start, stop in ranges
+        ]
+    else:
+        own = executor is None
+        if own:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = [
+                executor.submit(_partial, store, keys, value, start, stop, filters)
+                for start, stop in ranges
+            ]
+            partials = [future.result() for future in futures]
+        finally:
+            if own:
+                executor.shutdown()
+
+    count, total, m2, low, high = merge_partials(partials)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+        std = np.sqrt(m2 / (count - 1))
+    index = pd.MultiIndex.from_product(
+        [store.categories(col) for col in keys], names=keys
+    )
+    table = pd.DataFrame(
+        {"count": count, "sum": total, "mean": mean, "std": std, "min": low, "max": high},
+        index=index
+    )
+    table = table[table["count"] > 0]
+    if len(keys) == 1:
+        table.index = table.index.get_level_values(0)
+    return table
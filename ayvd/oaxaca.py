@@ -0,0 +1,196 @@
+"""Oaxaca-Blinder decomposition of the salary gap between men (A) and women
+and others (B).
+
+The gap of mean salaries is split into the part explained by differences in
+the covariates of both groups (contract, region, studies, experience, ...)
+and the unexplained part, due to different returns to the same covariates:
+
+    mean_A - mean_B = (xbar_A - xbar_B) b*  +  xbar_A (b_A - b*) + xbar_B (b* - b_B)
+                      `----- explained ----'   `------------ unexplained -----------'
+
+where b* are the reference coefficients, by default those of the pooled
+regression with a group indicator.
+
+The standard errors come from a bootstrap done as a batch: each resample is a
+vector of multinomial row counts, so its Gram matrices X'WX and X'Wy are
+matrix products of the count matrix with the pairwise products of the columns
+of the design, computed once. All the resamples are then solved together as a
+stack of small symmetric systems.
+
+    oaxaca_blinder(db, n_boot=1000)
+    oaxaca_blinder(db, categorical=[work_contract_type, region], log=True)
+"""
+import numpy as np
+import pandas as pd
+
+from .data import (
+    new_regions,
+    profile_age,
+    profile_gender,
+    profile_studies_level,
+    profile_years_experience,
+    region,
+    salary_monthly_NETO,
+    work_contract_type,
+    work_province,
+)
+
+CATEGORICAL = [work_contract_type, region, profile_studies_level]
+NUMERIC = [profile_years_experience, profile_age]
+
+
+def design(df, categorical=CATEGORICAL, numeric=NUMERIC, min_count=30):
+    """Returns the design matrix of @df with an intercept, the numeric
+    columns and dummies of the categorical ones (first level dropped, levels
+    with less than @min_count rows pooled), and the covariate of each column.
+    """
+    columns = {"intercept": np.ones(len(df))}
+    owners = ["intercept"]
+    for col in numeric:
+        columns[col] = df[col].to_numpy(dtype=float)
+        owners.append(col)
+    for col in categorical:
+        values = df[col].astype(str)
+        counts = values.value_counts()
+        values = values.where(values.map(counts) >= min_count, "Otros")
+        levels = values.value_counts().index[1:]
+        for level in levels:
+            columns[f"{col}[{level}]"] = (values == level).to_numpy(dtype=float)
+            owners.append(col)
+    return pd.DataFrame(columns, index=df.index), owners
+
+
+def _gram_layout(X, y):
+    """Returns the pairwise products of the columns of @X (upper triangle)
+    and of @X with @y, so that for row counts w, w @ products are the
+    entries of X'WX and X'Wy.
+    """
+    rows, cols = np.triu_indices(X.shape[1])
+    return X[:, rows] * X[:, cols], X * y[:, None], (rows, cols)
+
+
+def _grams(weights, products, xy, triu, p):
+    """Returns the stacks of X'WX and X'Wy for each row of @weights."""
+    upper = weights @ products
+    gram = np.zeros((weights.shape[0], p, p))
+    gram[:, triu[0], triu[1]] = upper
+    gram[:, triu[1], triu[0]] = upper
+    return gram, weights @ xy
+
+
+def _solve(gram, rhs):
+    return np.einsum("bij,bj->bi", np.linalg.pinv(gram, hermitian=True), rhs)
+
+
+def _decompose(wA, wB, layoutA, layoutB, XA, XB, p, reference):
+    """Returns gap, explained, unexplained and the explained part of each
+    column for the stack of row counts @wA and @wB.
+    """
+    gramA, rhsA = _grams(wA, *layoutA, p)
+    gramB, rhsB = _grams(wB, *layoutB, p)
+    nA = wA.sum(axis=1)[:, None]
+    nB = wB.sum(axis=1)[:, None]
+    xbarA = wA @ XA / nA
+    xbarB = wB @ XB / nB
+    betaA = _solve(gramA, rhsA)
+    betaB = _solve(gramB, rhsB)
+
+    if reference == "A":
+        beta = betaA
+    elif reference == "B":
+        beta = betaB
+    else:
+        # Pooled regression over [X, d] with d the indicator of group A.
+        sA = xbarA * nA
+        gram = np.zeros((len(wA), p + 1, p + 1))
+        gram[:, :p, :p] = gramA + gramB
+        gram[:, :p, p] = sA
+        gram[:, p, :p] = sA
+        gram[:, p, p] = nA[:, 0]
+        rhs = np.concatenate([rhsA + rhsB, rhsA[:, :1]], axis=1)
+        beta = _solve(gram, rhs)[:, :p]
+
+    detail = (xbarA - xbarB) * beta
+    explained = detail.sum(axis=1)
+    gap = (xbarA * betaA).sum(axis=1) - (xbarB * betaB).sum(axis=1)
+    return gap, explained, gap - explained, detail
+
+
+def oaxaca_blinder(
+    db,
+    categorical=CATEGORICAL,
+    numeric=NUMERIC,
+    n_boot=1000,
+    reference="pooled",
+    log=False,
+    min_salary=1000,
+    alpha=0.05,
+    batch_size=250,
+    seed=0,
+):
+    """Returns the decomposition of the salary gap between men and women and
+    others with its bootstrap standard errors and percentile intervals.
+
+    With @log the decomposition is done over the log salaries, so the gap is
+    approximately relative. The bootstrap resamples each group separately in
+    batches of @batch_size resamples.
+    """
+    if reference not in ("pooled", "A", "B"):
+        raise ValueError(f"Unknown reference: {reference}")
+    df = db[db[salary_monthly_NETO] > min_salary]
+    if region in categorical and region not in df:
+        df = df.assign(**{region: df[work_province].replace(new_regions)})
+    df = df.dropna(subset=list(categorical) + list(numeric))
+
+    X, owners = design(df, categorical, numeric)
+    y = df[salary_monthly_NETO].to_numpy(dtype=float)
+    if log:
+        y = np.log(y)
+    is_man = (df[profile_gender] == 'Hombre').to_numpy()
+    XA, XB = X.to_numpy()[is_man], X.to_numpy()[~is_man]
+    yA, yB = y[is_man], y[~is_man]
+    p = X.shape[1]
+    layoutA = _gram_layout(XA, yA)
+    layoutB = _gram_layout(XB, yB)
+
+    gap, explained, unexplained, detail = _decompose(
+        np.ones((1, len(yA))), np.ones((1, len(yB))),
+        layoutA, layoutB, XA, XB, p, reference
+    )
+
+    rng = np.random.default_rng(seed)
+    draws = []
+    for start in range(0, n_boot, batch_size):
+        size = min(batch_size, n_boot - start)
+        wA = rng.multinomial(len(yA), np.full(len(yA), 1 / len(yA)), size=size)
+        wB = rng.multinomial(len(yB), np.full(len(yB), 1 / len(yB)), size=size)
+        b_gap, b_explained, b_unexplained, b_detail = _decompose(
+            wA.astype(float), wB.astype(float), layoutA, layoutB, XA, XB, p, reference
+        )
+        details = pd.DataFrame(b_detail, columns=owners).T.groupby(level=0, sort=False).sum().T
+        draws.append(pd.concat([
+            pd.DataFrame({
+                "gap": b_gap,
+                "explained": b_explained,
+                "unexplained": b_unexplained,
+            }),
+            details.add_prefix("explained: "),
+        ], axis=1))
+    draws = pd.concat(draws, ignore_index=True)
+
+    details = pd.Series(detail[0], index=owners).groupby(level=0, sort=False).sum()
+    estimate = pd.concat([
+        pd.Series({
+            "gap": gap[0],
+            "explained": explained[0],
+            "unexplained": unexplained[0],
+        }),
+        details.add_prefix("explained: "),
+    ])
+    return pd.DataFrame({
+        "estimate": estimate,
+        "percentage_of_gap": estimate / gap[0] * 100,
+        "std_error": draws.std(),
+        "ci_low": draws.quantile(alpha / 2),
+        "ci_upp": draws.quantile(1 - alpha / 2),
+    })
@@ -0,0 +1,102 @@
+"""Figures of the lab analyses. Each function returns a new figure.
+
+matplotlib and seaborn are imported on the first figure, so importing this
+module is cheap for runs that only need tables.
+"""
+import numpy as np
+
+from .data import (
+    programming_language,
+    region,
+    region_order,
+    salary_monthly_NETO,
+)
+
+similar_langs = ["html", "javascript", ".net", "css"]
+top10 = [
+    "go",
+    "python",
+    "bash/shell",
+    "java",
+    "typescript",
+    "javascript",
+    "sql",
+    "css",
+    "html",
+    ".net"
+]
+
+
+def _load():
+    import matplotlib.pyplot as plt
+    import seaborn
+
+    return plt, seaborn
+
+
+def central_tendency(tendency_df, best_threshold):
+    plt, seaborn = _load()
+    fig = plt.figure(figsize=(15, 5))
+    seaborn.lineplot(
+        data=tendency_df,
+        x="threshold", y="value", hue="metric"
+    )
+    plt.axvline(best_threshold, color="r", linestyle="--", label="best threshold")
+    plt.legend()
+    plt.ticklabel_format(style="plain", axis="x")
+    seaborn.despine()
+    return fig
+
+
+def salary_boxenplot(df_langs, langs=None):
+    plt, seaborn = _load()
+    if langs is not None:
+        df_langs = df_langs[df_langs[programming_language].isin(langs)]
+    fig = plt.figure(figsize=(12, 6))
+    seaborn.boxenplot(
+        data=df_langs,
+        x=salary_monthly_NETO, y=programming_language,
+        color='orangered'
+    )
+    plt.ticklabel_format(style='plain', axis='x')
+    return fig
+
+
+def top_languages_barplot(df_langs, order=top10):
+    plt, seaborn = _load()
+    fig = plt.figure(figsize=(8, 6))
+    seaborn.barplot(
+        data=df_langs[df_langs[programming_language].isin(order)],
+        x=programming_language,
+        y=salary_monthly_NETO,
+        estimator=np.mean,
+        ci=None,
+        order=order
+    )
+    plt.xticks(rotation=90)
+    plt.ylabel("Salario Medio")
+    plt.xlabel("Lenguajes")
+    plt.ticklabel_format(style='plain', axis='y')
+    return fig
+
+
+def region_barplot(df, order=region_order):
+    plt, seaborn = _load()
+    fig = plt.figure(figsize=(8, 6))
+    seaborn.barplot(
+        y=df[salary_monthly_NETO],
+        x=df[region],
+        estimator=np.mean,
+        order=order
+    )
+    plt.xticks(rotation=90)
+    plt.ylabel("Media de salario mensual NETO")
+    plt.xlabel("Zonas de Argentina")
+    plt.ticklabel_format(style='plain', axis='y')
+    return fig
+
+
+def save_figure(fig, path):
+    plt, _ = _load()
+    fig.savefig(path, bbox_inches="tight")
+    plt.close(fig)
@@ -0,0 +1,105 @@
+"""Survey weights calibrated to known marginals by raking (iterative
+proportional fitting).
+
+Each margin is factorized once into integer codes, so every raking step is a
+`np.bincount` of the current weights per category followed by a `take` of the
+correction factors back to the rows. The weights are normalized to average 1
+over the whole sample, so a group that is upweighted adds up to more than its
+number of rows. They must not be used as frequency weights of a group as they
+are: `hypothesis_tests` and `weighted_agg` rescale them to sum to the number
+of rows of each group first.
+
+    weights = rake_frame(df, {
+        profile_gender: {"Hombre": 0.7, "Mujer": 0.28, "Otros": 0.02},
+        region: region_shares,
+        profile_age_segment: age_shares,
+    })
+    groupA, groupB = gender_groups(df)
+    hypothesis_tests(groupA, groupB, weightsA=weights[groupA.index],
+                     weightsB=weights[groupB.index])
+"""
+import numpy as np
+import pandas as pd
+
+
+class RakingError(ValueError):
+    pass
+
+
+def rake(codes, targets, weights=None, max_iter=100, tol=1e-8):
+    """Returns the weights that match @targets and the number of iterations
+    used.
+
+    @codes is a list of integer arrays, one per margin, with the category of
+    each row, and @targets the list of target shares of each category of
+    that margin. Rows start from @weights, or 1 when None.
+    """
+    n = len(codes[0])
+    weights = np.ones(n) if weights is None else np.asarray(weights, dtype=float).copy()
+    total = weights.sum()
+    targets = [
+        np.asarray(target, dtype=float) / np.sum(target) * total
+        for target in targets
+    ]
+    for target, code in zip(targets, codes):
+        present = np.bincount(code, minlength=target.size) > 0
+        if np.any((target > 0) & ~present):
+            raise RakingError("A category with a positive target has no rows.")
+
+    for iteration in range(1, max_iter + 1):
+        for code, target in zip(codes, targets):
+            current = np.bincount(code, weights=weights, minlength=target.size)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                factor = np.where(current > 0, target / current, 0.0)
+            weights *= factor.take(code)
+        error = max(
+            np.abs(np.bincount(code, weights=weights, minlength=target.size) - target).max()
+            for code, target in zip(codes, targets)
+        ) / total
+        if error < tol:
+            break
+    else:
+        raise RakingError(f"Raking did not converge after {max_iter} iterations.")
+    return weights / weights.mean(), iteration
+
+
+def rake_frame(df, margins, weights=None, max_iter=100, tol=1e-8):
+    """Returns a Series of weights for the rows of @df calibrated to
+    @margins, a dict from column to a dict of target shares per value.
+    """
+    codes = []
+    targets = []
+    for col, shares in margins.items():
+        categories = list(shares)
+        code = pd.Categorical(df[col], categories=categories).codes
+        if (code < 0).any():
+            missing = sorted(map(str, df[col][code < 0].unique()))
+            raise RakingError(f"{col} has values without a target: {missing}.")
+        codes.append(code.astype(np.int64))
+        targets.append([shares[category] for category in categories])
+    result, _ = rake(codes, targets, weights, max_iter, tol)
+    return pd.Series(result, index=df.index, name="weight")
+
+
+def weighted_agg(df, by, col, weights):
+    """Returns the weighted count, mean and std of @col grouped by @by, next
+    to the unweighted number of rows with a value of @col.
+
+    The std takes the weights of each group rescaled to sum to its number of
+    rows, so it is not shrunk by the weights of upweighted groups.
+    """
+    has_value = df[col].notna()
+    df = df[has_value]
+    weights = pd.Series(weights, index=has_value.index)[has_value]
+    frame = pd.DataFrame({"w": weights, "wx": weights * df[col], "n": 1}, index=df.index)
+    grouper = [df[key] for key in np.atleast_1d(by)]
+    groups = frame.groupby(grouper)
+    mean = groups["wx"].transform("sum") / groups["w"].transform("sum")
+    frame["wdd"] = weights * (df[col] - mean)**2
+    sums = frame.groupby(grouper).sum()
+    return pd.DataFrame({
+        "weight": sums["w"],
+        "mean": sums["wx"] / sums["w"],
+        "std": np.sqrt(sums["wdd"] / sums["w"] * sums["n"] / (sums["n"] - 1)),
+        "nobs": sums["n"],
+    })
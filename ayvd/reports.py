@@ -0,0 +1,200 @@
+"""Report sections. Each one takes the raw survey and writes its figures and
+tables into its own directory under @output_dir.
+
+When a `ResultCache` is given, the aggregations and figures are looked up by
+the content of the columns they depend on and only computed or rendered on a
+miss.
+"""
+import os
+
+import pandas as pd
+
+from . import analysis, plots
+from .cache import frame_key
+from .cube import Cube
+from .data import (
+    profile_age,
+    profile_age_segment,
+    profile_gender,
+    profile_years_experience,
+    programming_language,
+    region,
+    salary_in_usd,
+    salary_monthly_NETO,
+    to_categorical,
+    tools_programming_language,
+    work_contract_type,
+    work_province,
+)
+
+language_cols = [
+    tools_programming_language,
+    work_contract_type,
+    profile_years_experience,
+    salary_in_usd,
+    salary_monthly_NETO,
+]
+region_cols = [
+    work_province,
+    work_contract_type,
+    salary_monthly_NETO,
+    profile_years_experience,
+    profile_age,
+    salary_in_usd,
+]
+gender_cols = [salary_monthly_NETO, profile_gender]
+
+
+def _section_dir(output_dir, name):
+    path = os.path.join(output_dir, name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def save_table(table, path):
+    table.to_csv(path)
+
+
+def cached(cache, data, name, compute, **params):
+    """Returns compute() looking it up first in @cache by the content of
+    @data, @name and @params.
+    """
+    if cache is None:
+        return compute()
+    return cache.table(frame_key(data, name, **params), compute)
+
+
+def render(cache, path, plot_func, data, columns, **params):
+    """Saves plot_func(data, **params) into @path, copying it from @cache
+    instead of rendering it when @data[@columns] did not change.
+    """
+    if cache is None:
+        plots.save_figure(plot_func(data, **params), path)
+        return
+    fmt = os.path.splitext(path)[1][1:]
+    key = frame_key(data[columns], plot_func.__name__, fmt=fmt, **params)
+    if not cache.fetch(key, fmt, path):
+        plots.save_figure(plot_func(data, **params), path)
+        cache.store(key, fmt, path)
+
+
+def language_report(db, output_dir, cache=None, fmt="png"):
+    out = _section_dir(output_dir, "languages")
+    count_bylangs, tendency_df, best_threshold, best_langs, df_langs = cached(
+        cache,
+        db[language_cols],
+        "best_languages",
+        lambda: analysis.best_languages(analysis.language_population(db))
+    )
+
+    save_table(
+        count_bylangs.sort_values(by="count", ascending=False),
+        os.path.join(out, "count_bylangs.csv")
+    )
+    save_table(
+        best_langs.assign(
+            percentage=(best_langs["count"] / best_langs["count"].sum() * 100).round(2)
+        ).sort_values(by="salary_monthly_NETO_mean", ascending=False),
+        os.path.join(out, "best_langs.csv")
+    )
+    save_table(
+        df_langs[[programming_language, salary_monthly_NETO]]
+        .groupby(programming_language)
+        .describe(),
+        os.path.join(out, "salary_bylangs.csv")
+    )
+
+    render(
+        cache, os.path.join(out, f"central_tendency.{fmt}"),
+        plots.central_tendency, tendency_df, list(tendency_df.columns),
+        best_threshold=best_threshold
+    )
+    salary_bylang = [programming_language, salary_monthly_NETO]
+    render(
+        cache, os.path.join(out, f"similar_langs_boxenplot.{fmt}"),
+        plots.salary_boxenplot, df_langs, salary_bylang,
+        langs=plots.similar_langs
+    )
+    render(
+        cache, os.path.join(out, f"best_langs_boxenplot.{fmt}"),
+        plots.salary_boxenplot, df_langs, salary_bylang
+    )
+    render(
+        cache, os.path.join(out, f"top10_barplot.{fmt}"),
+        plots.top_languages_barplot, df_langs, salary_bylang
+    )
+
+
+def region_report(db, output_dir, cache=None, fmt="png"):
+    out = _section_dir(output_dir, "regions")
+    df = cached(
+        cache,
+        db[region_cols],
+        "region_population",
+        lambda: analysis.region_population(db)
+    )
+
+    save_table(
+        df[[region, salary_monthly_NETO]].groupby(region).describe(),
+        os.path.join(out, "salary_byregion.csv")
+    )
+
+    df = df.assign(**{
+        profile_age_segment: to_categorical(df[profile_age], bin_size=5, min_cut=15, max_cut=50)
+    })
+    cube = Cube.build(df, [region, work_contract_type, profile_age_segment, salary_in_usd])
+    save_table(
+        cube.rollup([profile_age_segment, work_contract_type]).table()[["size"]],
+        os.path.join(out, "contracts_byage.csv")
+    )
+    save_table(
+        cube.rollup([work_contract_type, salary_in_usd]).table()[["count", "mean", "std"]],
+        os.path.join(out, "salary_bycontract_dollarized.csv")
+    )
+    save_table(
+        cube.rollup([region, work_contract_type]).table()[["count", "mean", "std"]],
+        os.path.join(out, "salary_byregion_contract.csv")
+    )
+    render(
+        cache, os.path.join(out, f"region_barplot.{fmt}"),
+        plots.region_barplot, df, [region, salary_monthly_NETO]
+    )
+
+
+def hypothesis_report(db, output_dir, cache=None, fmt="png", alpha=0.05):
+    out = _section_dir(output_dir, "hypothesis")
+    tests = cached(
+        cache,
+        db[gender_cols],
+        "hypothesis_tests",
+        lambda: analysis.hypothesis_tests(*analysis.gender_groups(db), alpha),
+        alpha=alpha
+    )
+    save_table(
+        tests.to_frame("value"),
+        os.path.join(out, "gender_gap_tests.csv")
+    )
+
+
+def power_report(db, output_dir, cache=None, fmt="png", alpha=0.05):
+    out = _section_dir(output_dir, "power")
+    samples, power = cached(
+        cache,
+        db[gender_cols],
+        "power_analysis",
+        lambda: analysis.power_analysis(*analysis.gender_groups(db), alpha),
+        alpha=alpha
+    )
+    save_table(samples, os.path.join(out, "sample_sizes.csv"))
+    save_table(
+        pd.Series({"power": power}).to_frame("value"),
+        os.path.join(out, "power.csv")
+    )
+
+
+SECTIONS = {
+    "languages": language_report,
+    "regions": region_report,
+    "hypothesis": hypothesis_report,
+    "power": power_report,
+}
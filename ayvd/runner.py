@@ -0,0 +1,142 @@
+"""Headless batch runner for the lab analyses.
+
+The survey is loaded once in the parent process and handed to the workers
+through the pool initializer, so with the fork start method every worker
+shares the same loaded frame instead of reading the CSV again. Each report
+section runs in its own worker on the Agg backend.
+
+Figures and tables are kept in a content-addressed cache under the cache
+directory, so reruns over unchanged data skip their rendering.
+
+Usage:
+    python -m ayvd --output-dir reports
+    python -m ayvd --sections languages regions --data survey.csv --workers 2
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import reports
+from .cache import MAX_BYTES, ResultCache
+from .data import CACHE_DIR, load_survey
+
+_DB = None
+_CACHE = None
+
+
+def _init_worker(db, cache):
+    global _DB, _CACHE
+    os.environ["MPLBACKEND"] = "Agg"
+    # A parent that already imported matplotlib, e.g. a notebook, forks its
+    # interactive backend along with it.
+    if "matplotlib" in sys.modules:
+        import matplotlib
+
+        matplotlib.use("Agg")
+    _DB = db
+    _CACHE = cache
+
+
+def _run_section(name, output_dir, fmt):
+    start = time.perf_counter()
+    reports.SECTIONS[name](_DB, output_dir, cache=_CACHE, fmt=fmt)
+    return name, time.perf_counter() - start
+
+
+def _mp_context():
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return None
+
+
+def run(db, output_dir, sections=None, workers=None, cache=None, fmt="png"):
+    """Runs @sections of the report over @db writing into @output_dir and
+    returns the elapsed seconds of each section.
+    """
+    sections = list(sections or reports.SECTIONS)
+    unknown = set(sections) - set(reports.SECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown sections: {sorted(unknown)}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    workers = min(workers or os.cpu_count() or 1, len(sections))
+    elapsed = {}
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=_mp_context(),
+        initializer=_init_worker,
+        initargs=(db, cache)
+    ) as executor:
+        futures = [
+            executor.submit(_run_section, name, output_dir, fmt)
+            for name in sections
+        ]
+        for future in as_completed(futures):
+            name, seconds = future.result()
+            elapsed[name] = seconds
+    return elapsed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m ayvd",
+        description="Runs the lab analyses headlessly and writes their "
+                    "figures and tables."
+    )
+    parser.add_argument(
+        "--data",
+        help="Path or URL of the survey CSV. Defaults to the cached download."
+    )
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--output-dir", default="reports")
+    parser.add_argument(
+        "--sections",
+        nargs="+",
+        choices=list(reports.SECTIONS),
+        default=list(reports.SECTIONS)
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes. Defaults to the number of cores."
+    )
+    parser.add_argument("--figure-format", choices=["png", "svg"], default="png")
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=MAX_BYTES // 2**20,
+        help="Size limit in MiB of the figures and tables cache."
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always compute and render everything."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.environ["MPLBACKEND"] = "Agg"
+    db = load_survey(args.data, cache_dir=args.cache_dir)
+    cache = None
+    if not args.no_cache:
+        cache = ResultCache(
+            os.path.join(args.cache_dir, "results"),
+            max_bytes=args.cache_size * 2**20
+        )
+    elapsed = run(
+        db,
+        args.output_dir,
+        args.sections,
+        args.workers,
+        cache=cache,
+        fmt=args.figure_format
+    )
+    for name in args.sections:
+        print(f"{name}: {elapsed[name]:.2f}s", file=sys.stderr)
+    return 0
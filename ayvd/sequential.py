@@ -0,0 +1,250 @@
+"""Sequential comparison of two means for responses that arrive in batches.
+
+`SequentialTest` keeps only the sufficient statistics (count, mean and sum of
+squared deviations) of each group, so each batch costs O(1) on top of
+summarizing the batch itself, and the full history is never scanned again.
+After every batch it reports:
+
+- A group-sequential boundary for the z statistic of the difference of
+  means, obtained from a Lan-DeMets alpha spending function (O'Brien-Fleming
+  or Pocock like) at the current information fraction. The boundaries are
+  computed by propagating the density of the statistic through the looks on
+  a fixed grid, so each look costs the same regardless of how many came
+  before.
+- The always-valid p-value of the mixture sequential probability ratio test
+  (mSPRT) with a normal mixture N(0, tau^2) over the difference of means,
+  truncated to positive differences for the "larger" alternative, which can
+  be monitored continuously without inflating the type I error.
+"""
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+_norm = NormalDist()
+_ndtr = np.frompyfunc(lambda x: 0.5 * math.erfc(-x / math.sqrt(2)), 1, 1)
+_GRID_SIZE = 401
+_GRID_SDS = 8
+
+
+def _cdf(x):
+    return np.asarray(_ndtr(np.asarray(x, dtype=float)), dtype=float)
+
+
+def _pdf(x):
+    return np.exp(-0.5 * x**2) / math.sqrt(2 * math.pi)
+
+
+def obrien_fleming(t, alpha):
+    """Spent alpha at information fraction @t for O'Brien-Fleming like
+    boundaries.
+    """
+    if t <= 0:
+        return 0.0
+    return 2 * (1 - _norm.cdf(_norm.inv_cdf(1 - alpha / 2) / math.sqrt(t)))
+
+
+def pocock(t, alpha):
+    """Spent alpha at information fraction @t for Pocock like boundaries."""
+    if t <= 0:
+        return 0.0
+    return alpha * math.log(1 + (math.e - 1) * t)
+
+
+SPENDING_FUNCTIONS = {
+    "obrien_fleming": obrien_fleming,
+    "pocock": pocock,
+}
+
+
+class SufficientStats:
+    """Count, mean and sum of squared deviations of a stream of values."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        n = values.size
+        if n == 0:
+            return self
+        mean = values.mean()
+        m2 = ((values - mean)**2).sum()
+        return self.merge(n, mean, m2)
+
+    def merge(self, n, mean, m2):
+        """Adds the statistics of another sample (Chan et al. update)."""
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta**2 * self.n * n / total
+        self.n = total
+        return self
+
+    @property
+    def var(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else float("nan")
+
+
+class _SpendingBoundary:
+    """Boundaries of a group-sequential test through arbitrary looks.
+
+    The statistic is tracked as the Brownian motion W(t) = Z(t) * sqrt(t) in
+    information time, whose sub-density over the continuation region is kept
+    on a grid after each look.
+    """
+
+    def __init__(self, alpha, spending, two_sided):
+        self.alpha = alpha
+        self.spending = spending
+        self.two_sided = two_sided
+        self.t = 0.0
+        self.spent = 0.0
+        self.grid = None
+        self.density = None
+
+    def _crossing(self, c, t):
+        """Probability of crossing the boundary @c for the first time at @t."""
+        if self.grid is None:
+            upper = 1 - _norm.cdf(c)
+            return 2 * upper if self.two_sided else upper
+        sd = math.sqrt(t - self.t)
+        step = self.grid[1] - self.grid[0]
+        upper = 1 - _cdf((c * math.sqrt(t) - self.grid) / sd)
+        if self.two_sided:
+            upper = upper + _cdf((-c * math.sqrt(t) - self.grid) / sd)
+        return float((self.density * upper).sum() * step)
+
+    def _propagate(self, c, t):
+        lower = -c if self.two_sided else -_GRID_SDS
+        grid = np.linspace(lower * math.sqrt(t), c * math.sqrt(t), _GRID_SIZE)
+        if self.grid is None:
+            density = _pdf(grid / math.sqrt(t)) / math.sqrt(t)
+        else:
+            sd = math.sqrt(t - self.t)
+            step = self.grid[1] - self.grid[0]
+            kernel = _pdf((grid[:, None] - self.grid[None, :]) / sd) / sd
+            density = kernel @ self.density * step
+        self.grid, self.density = grid, density
+
+    def look(self, t):
+        """Returns the z boundary for a look at information fraction @t."""
+        t = min(t, 1.0)
+        if t <= self.t:
+            return float("inf")
+        target = self.spending(t, self.alpha)
+        if t >= 1.0:
+            target = self.alpha
+        increment = target - self.spent
+        if increment <= 0:
+            c = _GRID_SDS
+        else:
+            low, high = 0.0, _GRID_SDS
+            for _ in range(60):
+                mid = (low + high) / 2
+                if self._crossing(mid, t) > increment:
+                    low = mid
+                else:
+                    high = mid
+            c = high
+        self.spent += self._crossing(c, t)
+        self._propagate(c, t)
+        self.t = t
+        return c
+
+
+class SequentialTest:
+    """Sequential test of H0: mu_A - mu_B = 0 over batches of two groups.
+
+    @max_n is the planned total number of responses, used as the information
+    horizon of the alpha spending; reaching it spends the remaining alpha.
+    @tau is the standard deviation of the mSPRT mixture over the difference
+    of means. The mSPRT guarantee holds for a @tau fixed in advance. When None
+    it is set at the first look to @mixture_scale times the pooled standard
+    deviation of that look, a data-dependent scale for which the guarantee is
+    only approximate.
+    """
+
+    def __init__(
+        self,
+        max_n,
+        alpha=0.05,
+        spending="obrien_fleming",
+        alternative="larger",
+        tau=None,
+        mixture_scale=0.1,
+    ):
+        if alternative not in ("larger", "two-sided"):
+            raise ValueError(f"Unknown alternative: {alternative}")
+        self.max_n = max_n
+        self.alpha = alpha
+        self.alternative = alternative
+        self.tau = tau
+        self.mixture_scale = mixture_scale
+        self.groupA = SufficientStats()
+        self.groupB = SufficientStats()
+        self.boundary = _SpendingBoundary(
+            alpha,
+            SPENDING_FUNCTIONS[spending],
+            two_sided=alternative == "two-sided"
+        )
+        self.msprt_pvalue = 1.0
+        self.rejected = False
+        self.looks = []
+
+    def update(self, groupA, groupB):
+        """Adds a batch of values of each group and returns the state of the
+        test after it.
+        """
+        self.groupA.update(groupA)
+        self.groupB.update(groupB)
+        return self._look()
+
+    def _look(self):
+        a, b = self.groupA, self.groupB
+        diff = a.mean - b.mean
+        var = a.var / a.n + b.var / b.n if a.n > 1 and b.n > 1 else float("nan")
+        z = diff / math.sqrt(var) if var > 0 else float("nan")
+        info_fraction = (a.n + b.n) / self.max_n
+
+        c = self.boundary.look(info_fraction) if not math.isnan(z) else float("inf")
+        statistic = z if self.alternative == "larger" else abs(z)
+        self.rejected = self.rejected or statistic >= c
+
+        if not math.isnan(var):
+            if self.tau is None:
+                pooled = math.sqrt((a.m2 + b.m2) / (a.n + b.n - 2))
+                self.tau = self.mixture_scale * pooled
+            tau2 = self.tau**2
+            log_lr = 0.5 * math.log(var / (var + tau2)) \
+                + tau2 * diff**2 / (2 * var * (var + tau2))
+            if self.alternative == "larger":
+                # Half-normal mixture: the posterior mass of positive differences.
+                positive = 2 * _norm.cdf(self.tau * diff / math.sqrt(var * (var + tau2)))
+                log_lr = log_lr + math.log(positive) if positive > 0 else -math.inf
+            self.msprt_pvalue = min(self.msprt_pvalue, math.exp(-log_lr))
+
+        look = pd.Series({
+            "look": len(self.looks) + 1,
+            "nobs_A": a.n,
+            "nobs_B": b.n,
+            "diff": diff,
+            "std_error": math.sqrt(var) if var > 0 else float("nan"),
+            "zstat": z,
+            "info_fraction": min(info_fraction, 1.0),
+            "boundary": c,
+            "spent_alpha": self.boundary.spent,
+            "reject": self.rejected,
+            "msprt_pvalue": self.msprt_pvalue,
+            "msprt_reject": self.msprt_pvalue <= self.alpha,
+        })
+        self.looks.append(look)
+        return look
+
+    def results(self):
+        """Returns one row per look."""
+        return pd.DataFrame(self.looks)
@@ -0,0 +1,264 @@
+"""Local aggregate query service over the survey.
+
+Keeps the curated survey resident in memory and answers grouped aggregates as
+JSON over HTTP on localhost. Queries are normalized before being looked up in
+an LRU cache, so repeated dashboard queries skip pandas altogether, and
+requests are handled by a fixed pool of worker threads.
+
+Usage:
+    python -m ayvd.server --data survey.csv --port 8050
+
+    GET /query?group=region&metric=mean
+    GET /query?group=language&contract=Full-Time&max_experience=5&min_salary=18600&dollarized=exclude
+    GET /stats
+"""
+import argparse
+import functools
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .data import (
+    CACHE_DIR,
+    DOLLARIZED,
+    explode_languages,
+    load_survey,
+    new_regions,
+    profile_age,
+    profile_gender,
+    profile_studies_level,
+    profile_years_experience,
+    programming_language,
+    region,
+    salary_in_usd,
+    salary_monthly_BRUTO,
+    salary_monthly_NETO,
+    work_contract_type,
+    work_province,
+)
+
+GROUPS = {
+    "language": programming_language,
+    "region": region,
+    "province": work_province,
+    "contract": work_contract_type,
+    "gender": profile_gender,
+    "studies": profile_studies_level,
+    "dollarized": salary_in_usd,
+}
+COLUMNS = {
+    "neto": salary_monthly_NETO,
+    "bruto": salary_monthly_BRUTO,
+    "age": profile_age,
+    "experience": profile_years_experience,
+}
+METRICS = ("mean", "median", "std", "count", "min", "max", "sum")
+FILTERS = {
+    "contract": str,
+    "gender": str,
+    "region": str,
+    "min_salary": float,
+    "max_salary": float,
+    "min_experience": float,
+    "max_experience": float,
+    "max_age": float,
+    "dollarized": str,
+}
+
+
+class QueryError(ValueError):
+    pass
+
+
+def parse_query(params):
+    """Returns the canonical, hashable form of the query string @params."""
+    groups = tuple(dict.fromkeys(
+        group for value in params.pop("group", []) for group in value.split(",")
+    ))
+    if not groups:
+        raise QueryError("At least one group is required.")
+    unknown = [group for group in groups if group not in GROUPS]
+    if unknown:
+        raise QueryError(f"Unknown groups: {unknown}. Choose from {sorted(GROUPS)}.")
+
+    metrics = tuple(sorted({
+        metric for value in params.pop("metric", ["mean"]) for metric in value.split(",")
+    }))
+    if set(metrics) - set(METRICS):
+        raise QueryError(f"Unknown metrics. Choose from {list(METRICS)}.")
+
+    column = params.pop("column", ["neto"])[-1]
+    if column not in COLUMNS:
+        raise QueryError(f"Unknown column: {column}. Choose from {sorted(COLUMNS)}.")
+
+    filters = []
+    for name, values in sorted(params.items()):
+        if name not in FILTERS:
+            raise QueryError(f"Unknown filter: {name}.")
+        try:
+            values = tuple(sorted(FILTERS[name](value) for value in values))
+        except ValueError:
+            raise QueryError(f"Invalid value for {name}: {values}.")
+        if name == "dollarized" and set(values) - {"include", "exclude", "only"}:
+            raise QueryError("dollarized must be include, exclude or only.")
+        filters.append((name, values))
+    return groups, metrics, column, tuple(filters)
+
+
+class SurveyQueries:
+    """Grouped aggregates over the resident survey with an LRU result cache."""
+
+    def __init__(self, db, cache_size=1024):
+        self.db = db.assign(**{
+            region: db[work_province].replace(new_regions),
+            salary_in_usd: db[salary_in_usd].fillna("No dolarizado"),
+        })
+        self._languages = None
+        self._lock = threading.Lock()
+        self.run = functools.lru_cache(maxsize=cache_size)(self._run)
+
+    @property
+    def languages(self):
+        """The survey exploded by programming language, built once."""
+        with self._lock:
+            if self._languages is None:
+                self._languages = explode_languages(self.db)
+        return self._languages
+
+    def _mask(self, df, filters):
+        mask = df[salary_monthly_NETO].notna()
+        for name, values in filters:
+            if name == "contract":
+                mask &= df[work_contract_type].isin(values)
+            elif name == "gender":
+                mask &= df[profile_gender].isin(values)
+            elif name == "region":
+                mask &= df[region].isin(values)
+            elif name == "min_salary":
+                mask &= df[salary_monthly_NETO] > max(values)
+            elif name == "max_salary":
+                mask &= df[salary_monthly_NETO] <= min(values)
+            elif name == "min_experience":
+                mask &= df[profile_years_experience] >= max(values)
+            elif name == "max_experience":
+                mask &= df[profile_years_experience] <= min(values)
+            elif name == "max_age":
+                mask &= df[profile_age] < min(values)
+            elif name == "dollarized" and values[-1] != "include":
+                is_dollarized = df[salary_in_usd] == DOLLARIZED
+                mask &= is_dollarized if values[-1] == "only" else ~is_dollarized
+        return mask
+
+    def _run(self, groups, metrics, column, filters):
+        df = self.languages if "language" in groups else self.db
+        group_cols = [GROUPS[group] for group in groups]
+        col = COLUMNS[column]
+        table = df[self._mask(df, filters)] \
+            .groupby(group_cols, dropna=False)[col] \
+            .agg(list(metrics)) \
+            .reset_index()
+        table.columns = list(groups) + list(metrics)
+        table = table.astype(object).where(table.notna(), None)
+        return json.dumps({
+            "group": list(groups),
+            "column": col,
+            "filters": {name: list(values) for name, values in filters},
+            "rows": table.to_dict("records"),
+        }, default=str)
+
+    def query(self, params):
+        """Returns the JSON answer of the query string @params."""
+        return self.run(*parse_query(dict(params)))
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def _send(self, status, body):
+        body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        queries = self.server.queries
+        if url.path == "/query":
+            try:
+                self._send(200, queries.query(parse_qs(url.query)))
+            except QueryError as err:
+                self._send(400, json.dumps({"error": str(err)}))
+            except Exception as err:
+                self.log_error("Query failed: %r", err)
+                self._send(500, json.dumps({"error": f"Internal error: {err}"}))
+        elif url.path == "/stats":
+            info = queries.run.cache_info()
+            self._send(200, json.dumps({
+                "rows": len(queries.db),
+                "cache": info._asdict(),
+            }))
+        else:
+            self._send(404, json.dumps({"error": "Not found."}))
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class QueryServer(HTTPServer):
+    """HTTP server handing each request to a pool of worker threads."""
+
+    def __init__(self, address, queries, workers=8, verbose=False):
+        super().__init__(address, _Handler)
+        self.queries = queries
+        self.verbose = verbose
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ayvd.server")
+    parser.add_argument("--data", help="Path or URL of the survey CSV.")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--cache-size", type=int, default=1024)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    queries = SurveyQueries(
+        load_survey(args.data, cache_dir=args.cache_dir),
+        cache_size=args.cache_size
+    )
+    server = QueryServer(
+        (args.host, args.port), queries, workers=args.workers, verbose=args.verbose
+    )
+    print(f"Serving on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Bounded-memory top-k of multi-valued survey columns over a stream.
+
+`SpaceSaving` keeps at most `capacity` counters per column. The count
+reported for an item is never below its true count and overestimates it by
+at most the item's `error`, which is itself at most N / capacity for a stream
+of N values. `CountMinSketch` gives an independent upper bound, at most
+e / width * N over the true count with probability 1 - exp(-depth), and
+tightens the estimates. Both summaries merge across chunks and workers.
+
+    tracker = TopKTracker({tools_programming_language: split_languages})
+    for chunk in pd.read_csv(path, chunksize=10000):
+        tracker.update(chunk)
+    tracker.top(tools_programming_language, 20)
+"""
+import math
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from .data import split_languages, tools_programming_language
+
+
+def split_items(items_str):
+    """Splits a comma separated answer into lowercase items."""
+    if not isinstance(items_str, str):
+        return []
+    return [item.strip().lower() for item in items_str.split(",") if item.strip()]
+
+
+class SpaceSaving:
+    """Space-Saving summary with at most @capacity counters."""
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.n = 0
+
+    @property
+    def min_count(self):
+        """Upper bound of the count of any item without a counter."""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(self.counts.values())
+
+    def update(self, items):
+        """Adds @items, counting each chunk exactly before merging it."""
+        exact = Counter(items)
+        # One spare counter keeps its min_count at 0: the chunk is exact.
+        other = SpaceSaving(len(exact) + 1)
+        other.counts = dict(exact)
+        other.errors = dict.fromkeys(exact, 0)
+        other.n = sum(exact.values())
+        return self.merge(other)
+
+    def merge(self, other):
+        """Adds the summary @other keeping both bounds of every count."""
+        own_min, other_min = self.min_count, other.min_count
+        counts, errors = {}, {}
+        for item in self.counts.keys() | other.counts.keys():
+            counts[item] = self.counts.get(item, own_min) + other.counts.get(item, other_min)
+            errors[item] = self.errors.get(item, own_min) + other.errors.get(item, other_min)
+        if len(counts) > self.capacity:
+            kept = sorted(counts, key=counts.get, reverse=True)[:self.capacity]
+            counts = {item: counts[item] for item in kept}
+            errors = {item: errors[item] for item in kept}
+        self.counts, self.errors = counts, errors
+        self.n += other.n
+        return self
+
+    def top(self, k):
+        """Returns the @k items with the largest counts as (item, count,
+        error) tuples.
+        """
+        items = sorted(self.counts, key=self.counts.get, reverse=True)[:k]
+        return [(item, self.counts[item], self.errors[item]) for item in items]
+
+
+class CountMinSketch:
+    """Count-Min sketch of @depth rows of @width counters."""
+
+    def __init__(self, width=2048, depth=4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.n = 0
+
+    def _buckets(self, items):
+        values = np.asarray(items, dtype=object)
+        return np.stack([
+            pd.util.hash_array(values, hash_key=f"ayvd-cms-{row:07d}") % self.width
+            for row in range(self.depth)
+        ]).astype(np.int64)
+
+    def update(self, items):
+        if len(items) == 0:
+            return self
+        buckets = self._buckets(items)
+        for row in range(self.depth):
+            np.add.at(self.table[row], buckets[row], 1)
+        self.n += len(items)
+        return self
+
+    def merge(self, other):
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Only sketches of the same shape can be merged.")
+        self.table += other.table
+        self.n += other.n
+        return self
+
+    def estimate(self, items):
+        """Returns upper bounds of the counts of @items."""
+        if len(items) == 0:
+            return np.zeros(0, dtype=np.int64)
+        buckets = self._buckets(items)
+        return self.table[np.arange(self.depth)[:, None], buckets].min(axis=0)
+
+    @property
+    def error_bound(self):
+        """Additive overestimate not exceeded with probability 1 - delta."""
+        return math.e / self.width * self.n
+
+    @property
+    def delta(self):
+        return math.exp(-self.depth)
+
+
+class TopKTracker:
+    """Space-Saving and Count-Min summaries of the items of each column of
+    @columns, a dict from column name to the function that splits an answer
+    into items.
+    """
+
+    def __init__(self, columns=None, capacity=200, width=2048, depth=4):
+        self.columns = columns or {tools_programming_language: split_languages}
+        self.summaries = {col: SpaceSaving(capacity) for col in self.columns}
+        self.sketches = {col: CountMinSketch(width, depth) for col in self.columns}
+
+    def update(self, chunk):
+        """Adds the answers of the frame @chunk."""
+        for col, split in self.columns.items():
+            items = [item for answer in chunk[col] for item in split(answer)]
+            self.summaries[col].update(items)
+            self.sketches[col].update(items)
+        return self
+
+    def merge(self, other):
+        for col in self.columns:
+            self.summaries[col].merge(other.summaries[col])
+            self.sketches[col].merge(other.sketches[col])
+        return self
+
+    def top(self, col, k=20):
+        """Returns the approximate top @k items of @col with the bounds of
+        their counts: the true count lies in [lower, count].
+        """
+        summary, sketch = self.summaries[col], self.sketches[col]
+        rows = summary.top(k)
+        items = [item for item, _, _ in rows]
+        upper = np.minimum([count for _, count, _ in rows], sketch.estimate(items))
+        lower = [count - error for _, count, error in rows]
+        table = pd.DataFrame({"count": upper, "lower": lower}, index=pd.Index(items, name=col))
+        table["error"] = table["count"] - table["lower"]
+        table = table.sort_values(by="count", ascending=False)
+        table.attrs["n"] = summary.n
+        table.attrs["max_error"] = summary.n / summary.capacity
+        return table
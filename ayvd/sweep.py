@@ -0,0 +1,171 @@
+"""Sensitivity of the lab conclusions to their hard-coded thresholds.
+
+Evaluates the language ranking of exercise1 and the gender gap test of part 2
+for every point of a grid of thresholds on a process pool. Loading the survey
+and exploding the programming languages happen once in the parent process and
+are shared with the workers through the pool initializer. Each finished grid
+point is appended to the output CSV right away, so an interrupted sweep
+resumes from the points that are still missing.
+
+Usage:
+    python -m ayvd.sweep --output sweep.csv \\
+        --minwage 15000 18600 21000 --max-experience 3 5 10 \\
+        --n-std 2 2.5 3 --max-threshold 50 100
+"""
+import argparse
+import itertools
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from . import analysis
+from .data import (
+    CACHE_DIR,
+    MINWAGE_IN_ARG,
+    clean_outliers,
+    explode_languages,
+    load_survey,
+    programming_language,
+    salary_monthly_NETO,
+)
+
+PARAMS = ["minwage", "max_experience", "n_std", "max_threshold"]
+DEFAULTS = {
+    "minwage": MINWAGE_IN_ARG,
+    "max_experience": 5,
+    "n_std": 2.5,
+    "max_threshold": 100,
+}
+TOP = 10
+
+_DB = None
+_LANGUAGES = None
+
+
+def _init_worker(db, languages):
+    global _DB, _LANGUAGES
+    _DB = db
+    _LANGUAGES = languages
+
+
+def evaluate(db, languages, minwage, max_experience, n_std, max_threshold, alpha=0.05):
+    """Returns the language ranking and gender gap test of one grid point.
+
+    @languages is @db already exploded by programming language. The gender
+    groups take @minwage as their salary floor, instead of the 1000 of part
+    2, and drop the salaries further than @n_std deviations from the mean.
+    """
+    df = analysis.junior_population(languages, minwage, max_experience)
+    _, _, best_threshold, best_langs, df_langs = analysis.best_languages(
+        df, max_threshold, n_std
+    )
+    ranking = df_langs.groupby(programming_language)[salary_monthly_NETO] \
+        .mean() \
+        .sort_values(ascending=False)
+
+    population = clean_outliers(
+        db[db[salary_monthly_NETO] > minwage], salary_monthly_NETO, n_std
+    )
+    tests = analysis.hypothesis_tests(*analysis.gender_groups(population), alpha)
+
+    return {
+        "minwage": minwage,
+        "max_experience": max_experience,
+        "n_std": n_std,
+        "max_threshold": max_threshold,
+        "best_threshold": best_threshold,
+        "n_best_langs": len(best_langs),
+        "top_language": ranking.index[0] if len(ranking) else None,
+        "ranking": "|".join(ranking.index[:TOP]),
+        "gap_diff": tests["diff"],
+        "gap_percentage": tests["diff_percentage"],
+        "gap_ztstat": tests["ztstat"],
+        "gap_zpvalue": tests["zpvalue"],
+        "gap_reject": tests["zreject"],
+    }
+
+
+def _evaluate(point):
+    return evaluate(_DB, _LANGUAGES, **point)
+
+
+def grid(**values):
+    """Returns the list of grid points of the cartesian product of @values,
+    using the default of every parameter that is not given.
+    """
+    axes = [values.get(param) or [DEFAULTS[param]] for param in PARAMS]
+    return [dict(zip(PARAMS, point)) for point in itertools.product(*axes)]
+
+
+def _done(output):
+    if not os.path.exists(output):
+        return set()
+    done = pd.read_csv(output, usecols=PARAMS)
+    return {tuple(float(value) for value in row) for row in done.itertuples(index=False)}
+
+
+def _mp_context():
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return None
+
+
+def sweep(db, points, output, workers=None):
+    """Evaluates the grid @points missing from @output, appending each
+    result to it, and returns the whole result table.
+    """
+    done = _done(output)
+    pending = [
+        point for point in points
+        if tuple(float(point[param]) for param in PARAMS) not in done
+    ]
+    if pending:
+        languages = explode_languages(db)
+        workers = min(workers or os.cpu_count() or 1, len(pending))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=_mp_context(),
+            initializer=_init_worker,
+            initargs=(db, languages)
+        ) as executor:
+            futures = [executor.submit(_evaluate, point) for point in pending]
+            for future in as_completed(futures):
+                row = pd.DataFrame([future.result()])
+                row.to_csv(
+                    output,
+                    mode="a",
+                    header=not os.path.exists(output),
+                    index=False
+                )
+    return pd.read_csv(output).sort_values(PARAMS).reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ayvd.sweep")
+    parser.add_argument("--data", help="Path or URL of the survey CSV.")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--output", default="sweep.csv")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--minwage", type=float, nargs="+")
+    parser.add_argument("--max-experience", type=float, nargs="+")
+    parser.add_argument("--n-std", type=float, nargs="+")
+    parser.add_argument("--max-threshold", type=int, nargs="+")
+    args = parser.parse_args(argv)
+
+    points = grid(
+        minwage=args.minwage,
+        max_experience=args.max_experience,
+        n_std=args.n_std,
+        max_threshold=args.max_threshold
+    )
+    db = load_survey(args.data, cache_dir=args.cache_dir)
+    results = sweep(db, points, args.output, args.workers)
+    print(f"{len(results)} grid points in {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Scaling benchmark of `ayvd.groupby.group_agg` across 1..N cores.
+
+Writes a synthetic survey-like column store of --rows rows into a temporary
+directory and times the per-region and per-language salary aggregates with
+pandas and with the partitioned executor at each number of workers.
+
+Usage (from the root of the repository):
+    python benchmarks/groupby_scaling.py --rows 10000000 --max-workers 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ayvd.colstore import write_store  # noqa: E402
+from ayvd.data import (  # noqa: E402
+    MINWAGE_IN_ARG,
+    new_regions,
+    programming_language,
+    region,
+    salary_monthly_NETO,
+    work_contract_type,
+)
+from ayvd.groupby import group_agg  # noqa: E402
+
+LANGUAGES = [
+    "javascript", "sql", "html", "python", "java", "css", "typescript",
+    ".net", "php", "bash/shell", "go", "c", "ruby", "kotlin", "swift",
+]
+CONTRACTS = ["Full-Time", "Part-Time", "Freelance", "Tercerizado"]
+
+
+def synthetic(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        salary_monthly_NETO: rng.lognormal(11.2, 0.6, rows),
+        region: rng.choice(sorted(set(new_regions.values())), rows),
+        programming_language: rng.choice(LANGUAGES, rows),
+        work_contract_type: rng.choice(CONTRACTS, rows, p=[0.7, 0.1, 0.1, 0.1]),
+    })
+
+
+def timeit(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    df = synthetic(args.rows)
+    filters = [
+        (work_contract_type, "==", "Full-Time"),
+        (salary_monthly_NETO, ">", MINWAGE_IN_ARG),
+    ]
+    mask = (df[work_contract_type] == "Full-Time") & (df[salary_monthly_NETO] > MINWAGE_IN_ARG)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = write_store(
+            df,
+            os.path.join(tmp, "bench.columns"),
+            numeric=[salary_monthly_NETO],
+            categorical=[region, programming_language, work_contract_type]
+        )
+        print(f"rows: {args.rows}")
+        for key in (region, programming_language):
+            expected = df[mask].groupby(key)[salary_monthly_NETO] \
+                .agg(["count", "mean", "std", "min", "max"])
+            pandas_time = timeit(
+                lambda: df[mask].groupby(key)[salary_monthly_NETO]
+                .agg(["count", "mean", "std", "min", "max"]),
+                args.repeat
+            )
+            print(f"\n{key}: pandas {pandas_time:.3f}s")
+            print(f"{'workers':>8} {'seconds':>8} {'speedup':>8}")
+            for workers in range(1, args.max_workers + 1):
+                # The pool is started outside of the timings, as a long
+                # running report would keep it around.
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    def run():
+                        return group_agg(
+                            store, [key], salary_monthly_NETO, filters,
+                            workers=workers, executor=executor
+                        )
+
+                    pd.testing.assert_frame_equal(
+                        run()[expected.columns].sort_index(),
+                        expected.sort_index(),
+                        check_names=False,
+                        check_index_type=False,
+                        check_dtype=False
+                    )
+                    seconds = timeit(run, args.repeat)
+                print(f"{workers:>8} {seconds:>8.3f} {pandas_time / seconds:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
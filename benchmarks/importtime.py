@@ -0,0 +1,76 @@
+"""Cold start benchmark of the compute-only modules of `ayvd`.
+
+Imports each module in a fresh interpreter with `python -X importtime`, prints
+the slowest top level imports and fails if any of the heavy packages that are
+meant to load lazily was imported, or if the import took more than the budget.
+
+Usage (from the root of the repository):
+    python benchmarks/importtime.py
+    python benchmarks/importtime.py --modules ayvd.runner --budget-ms 800
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMPUTE_MODULES = ["ayvd.data", "ayvd.analysis", "ayvd.cache", "ayvd.reports"]
+LAZY_PACKAGES = ["matplotlib", "seaborn", "statsmodels", "scipy"]
+
+
+def importtime(module):
+    """Returns (self_us, cumulative_us, name, depth) for every module imported
+    by a fresh interpreter importing @module.
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), name.strip(), depth))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modules", nargs="+", default=COMPUTE_MODULES)
+    parser.add_argument("--budget-ms", type=float, default=1000)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        rows = importtime(module)
+        total_ms = next(
+            cumulative for _, cumulative, name, _ in rows if name == module
+        ) / 1000
+        loaded = {name.split(".")[0] for _, _, name, _ in rows}
+        eager = sorted(loaded & set(LAZY_PACKAGES))
+
+        print(f"{module}: {total_ms:.1f} ms")
+        top_level = sorted(
+            (row for row in rows if row[3] <= 1 and row[2] != module),
+            reverse=True,
+            key=lambda row: row[1]
+        )
+        for _, cumulative, name, _ in top_level[:args.top]:
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+        if eager:
+            print(f"    eagerly imported: {', '.join(eager)}")
+        if eager or total_ms > args.budget_ms:
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from ayvd.sketch import SpaceSaving, TopKTracker, split_items
+
+
+def check_bounds(summary, counts):
+    for item, count, error in summary.top(summary.capacity):
+        assert counts[item] <= count <= counts[item] + error
+        assert error <= summary.n / summary.capacity
+
+
+def test_stale_item_is_not_inflated_by_later_chunks():
+    summary = SpaceSaving(capacity=50)
+    summary.update(["z"])
+    for _ in range(100):
+        summary.update(["a"] * 50 + ["b"] * 50)
+    counts = {"z": 1, "a": 5000, "b": 5000}
+    assert summary.counts["z"] == 1
+    check_bounds(summary, counts)
+
+
+def test_space_saving_bounds_over_skewed_chunks():
+    rng = np.random.default_rng(0)
+    summary = SpaceSaving(capacity=20)
+    counts = Counter()
+    for _ in range(200):
+        items = list(rng.zipf(1.5, size=rng.integers(1, 50)) % 200)
+        counts.update(items)
+        summary.update(items)
+    assert summary.n == sum(counts.values())
+    check_bounds(summary, counts)
+
+
+def test_tracker_top_lower_and_upper_bounds():
+    rng = np.random.default_rng(1)
+    languages = np.array(["python", "java", "c", "go", "rust", "php", "sql", "bash"])
+    answers = [
+        ", ".join(rng.choice(languages, size=rng.integers(1, 4), replace=False))
+        for _ in range(2000)
+    ]
+    counts = Counter(item for answer in answers for item in split_items(answer))
+    tracker = TopKTracker({"langs": split_items}, capacity=4, width=64, depth=3)
+    for start in range(0, len(answers), 100):
+        tracker.update(pd.DataFrame({"langs": answers[start:start + 100]}))
+    top = tracker.top("langs", 4)
+    for item, row in top.iterrows():
+        assert row["lower"] <= counts[item] <= row["count"]
+    assert (top["error"] <= top.attrs["max_error"]).all()